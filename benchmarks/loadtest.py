@@ -0,0 +1,313 @@
+"""
+Load test with scripted user journeys, run against a live server:
+
+    python manage.py seed_load --size medium
+    gunicorn butter_split.wsgi:application --bind 127.0.0.1:8000 --workers 4
+
+    python benchmarks/loadtest.py http://127.0.0.1:8000 --users 20 --duration 60
+
+Every virtual user repeats one of two journeys, chosen by --anonymous-share:
+
+- anonymous: opens the index, creates an event, adds expenses through the detail page and opens the settlements;
+- registered: logs in as a seeded load user and pages through the event list, with and without a search.
+
+Requests go through the same CSRF tokens, session cookies and post/redirect/get round trips as a browser, and
+redirects are followed by hand so every hop is measured on its own. Throughput, latency percentiles and error
+rates are reported per URL name and method; --output also writes them as JSON.
+
+Only the standard library is used, so it can run from any machine that can reach the server.
+"""
+import argparse
+import http.cookiejar
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from html.parser import HTMLParser
+
+# must match service.urls
+ROUTES = (
+    ('index', re.compile(r'^/$')),
+    ('event-list', re.compile(r'^/event/list$')),
+    ('event-create', re.compile(r'^/event/create$')),
+    ('event-detail', re.compile(r'^/event/\d+$')),
+    ('event-calculate', re.compile(r'^/event/calculate/\d+$')),
+    ('login', re.compile(r'^/accounts/login$')),
+)
+# must match service.seeding
+SEED_USER_PASSWORD = 'load-user-password'
+SEARCH_TERMS = ('event', 'event 1', 'event 2')
+
+
+class JourneyError(Exception):
+    pass
+
+
+class PageParser(HTMLParser):
+    # collects what a browser would submit: the CSRF token, the options of every select, and the next page link
+    def __init__(self):
+        super().__init__()
+        self.csrf_token = None
+        self.options = defaultdict(list)
+        self.next_link = None
+        self._select = None
+        self._link = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == 'input' and attrs.get('name') == 'csrfmiddlewaretoken':
+            self.csrf_token = attrs.get('value')
+        elif tag == 'select':
+            self._select = attrs.get('name')
+        elif tag == 'option' and self._select and attrs.get('value'):
+            self.options[self._select].append(attrs['value'])
+        elif tag == 'a' and 'cursor=' in attrs.get('href', ''):
+            self._link = attrs['href']
+
+    def handle_endtag(self, tag):
+        if tag == 'select':
+            self._select = None
+        elif tag == 'a':
+            self._link = None
+
+    def handle_data(self, data):
+        # the pagination links are only told apart by their arrows
+        if self._link and '\u00bb' in data:
+            self.next_link = self._link
+
+
+def parse_page(body: str) -> PageParser:
+    parser = PageParser()
+    parser.feed(body)
+
+    return parser
+
+
+def get_url_name(path: str) -> str:
+    for name, pattern in ROUTES:
+        if pattern.match(path):
+            return name
+
+    return path
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label: str, latency: float, failed: bool):
+        with self.lock:
+            self.latencies[label].append(latency)
+
+            if failed:
+                self.errors[label] += 1
+
+
+class Browser:
+    def __init__(self, base_url: str, stats: Stats, timeout: float):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            NoRedirectHandler(),
+        )
+
+    def request(self, method: str, path: str, data: dict | None = None, expect: int = 200) -> tuple[str, str | None]:
+        url = urllib.parse.urljoin(self.base_url + '/', path.lstrip('/')) if not path.startswith('http') else path
+        label = f'{get_url_name(urllib.parse.urlsplit(url).path)} {method}'
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data is not None else None
+        request = urllib.request.Request(url, data=body, method=method, headers={'Referer': url})
+        started_at = time.perf_counter()
+        status = None
+        content = ''
+        location = None
+
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                status = response.status
+                content = response.read().decode()
+        except urllib.error.HTTPError as error:
+            # redirects surface as errors because they are not followed automatically
+            status = error.code
+            location = error.headers.get('Location')
+            content = error.read().decode(errors='replace')
+        except OSError:
+            pass
+
+        self.stats.record(label, time.perf_counter() - started_at, status != expect)
+
+        if status != expect:
+            raise JourneyError(f'{method} {path}: expected {expect}, got {status}')
+
+        return content, location
+
+    def get(self, path: str) -> PageParser:
+        content, _ = self.request('GET', path)
+
+        return parse_page(content)
+
+    def post_and_follow(self, path: str, data: dict) -> tuple[str, PageParser]:
+        # post/redirect/get: a valid form answers with a redirect, which is then loaded like a browser would
+        _, location = self.request('POST', path, data, expect=302)
+
+        return location, self.get(location)
+
+
+def anonymous_journey(browser: Browser, rng: random.Random, options):
+    browser.get('/')
+    page = browser.get('/event/create')
+
+    if not page.options['currency']:
+        raise JourneyError('No currencies to create an event with, run seed_load first.')
+
+    participants = [f'Guest {i}' for i in range(rng.randint(2, 6))]
+    event_url, page = browser.post_and_follow('/event/create', {
+        'csrfmiddlewaretoken': page.csrf_token,
+        'name': f'Load event {uuid.uuid4().hex[:12]}',
+        'currency': rng.choice(page.options['currency']),
+        'participants': participants,
+    })
+
+    for i in range(options.expenses):
+        _, page = browser.post_and_follow(event_url, {
+            'csrfmiddlewaretoken': page.csrf_token,
+            'name': f'Expense {i}',
+            'payer': rng.choice(page.options['payer']),
+            'amount': f'{rng.uniform(1, 100):.2f}',
+        })
+
+    event_id = urllib.parse.urlsplit(event_url).path.rstrip('/').rsplit('/', 1)[-1]
+    browser.get(f'/event/calculate/{event_id}')
+
+
+def registered_journey(browser: Browser, rng: random.Random, options):
+    page = browser.get('/accounts/login')
+    browser.post_and_follow('/accounts/login', {
+        'csrfmiddlewaretoken': page.csrf_token,
+        'username': f'{options.username_prefix}{rng.randrange(options.user_count)}',
+        'password': options.password,
+    })
+
+    for query in ('', f'?name={urllib.parse.quote(rng.choice(SEARCH_TERMS))}'):
+        page = browser.get(f'/event/list{query}')
+
+        for _ in range(options.pages - 1):
+            if not page.next_link:
+                break
+
+            page = browser.get(f'/event/list{page.next_link}')
+
+
+def virtual_user(index: int, options, stats: Stats, deadline: float, journeys: list):
+    rng = random.Random(options.seed + index if options.seed is not None else None)
+
+    while time.monotonic() < deadline:
+        journey = anonymous_journey if rng.random() < options.anonymous_share else registered_journey
+
+        try:
+            journey(Browser(options.url, stats, options.timeout), rng, options)
+        except JourneyError as error:
+            journeys.append((journey.__name__, str(error)))
+        else:
+            journeys.append((journey.__name__, None))
+
+        time.sleep(options.think_time)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(stats: Stats, elapsed: float) -> dict:
+    summary = {}
+
+    for label, latencies in sorted(stats.latencies.items()):
+        latencies = sorted(latencies)
+        summary[label] = {
+            'requests': len(latencies),
+            'requests_per_second': round(len(latencies) / elapsed, 2),
+            'error_rate': round(stats.errors[label] / len(latencies), 4),
+            'p50_ms': round(statistics.median(latencies) * 1000, 1),
+            'p90_ms': round(percentile(latencies, 0.90) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+            'max_ms': round(latencies[-1] * 1000, 1),
+        }
+
+    return summary
+
+
+def report(summary: dict, journeys: list, elapsed: float):
+    print(f'{len(journeys)} journeys in {elapsed:.1f}s, {sum(1 for _, error in journeys if error)} failed')
+    print(f'{"url name":<24} {"req":>6} {"req/s":>7} {"err %":>6} {"p50":>8} {"p90":>8} {"p99":>8} {"max":>8}')
+
+    for label, row in summary.items():
+        print(
+            f'{label:<24} {row["requests"]:>6} {row["requests_per_second"]:>7} {row["error_rate"] * 100:>6.1f} '
+            f'{row["p50_ms"]:>8} {row["p90_ms"]:>8} {row["p99_ms"]:>8} {row["max_ms"]:>8}'
+        )
+
+    errors = sorted({error for _, error in journeys if error})
+
+    for error in errors[:10]:
+        print(f'error: {error}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users.')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to keep starting journeys.')
+    parser.add_argument('--anonymous-share', type=float, default=0.5, help='Share of journeys made anonymously.')
+    parser.add_argument('--expenses', type=int, default=3, help='Expenses added per anonymous journey.')
+    parser.add_argument('--pages', type=int, default=3, help='Event list pages read per search.')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Seconds between journeys of one user.')
+    parser.add_argument('--user-count', type=int, default=10, help='Log in as one of the first N seeded load users.')
+    parser.add_argument('--username-prefix', default='load-user-')
+    parser.add_argument('--password', default=SEED_USER_PASSWORD)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help='Also write the summary as JSON.')
+    options = parser.parse_args()
+
+    stats = Stats()
+    journeys = []
+    started_at = time.monotonic()
+    deadline = started_at + options.duration
+    threads = [
+        threading.Thread(target=virtual_user, args=(index, options, stats, deadline, journeys), daemon=True)
+        for index in range(options.users)
+    ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started_at
+    summary = summarize(stats, elapsed)
+    report(summary, journeys, elapsed)
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump({'url': options.url, 'users': options.users, 'seconds': round(elapsed, 1), 'results': summary}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Slow-client benchmark: how well does a server keep answering while many clients upload slowly?
+
+Opens --slow-clients connections that POST a --body-size form one byte every --byte-interval, then measures
+the latency of --probes normal GET requests made in the meantime. The headers go out at once, so the server
+hands every upload to the application: a sync worker reads the body when CsrfViewMiddleware reads
+request.POST and is held for the whole upload, while Django's ASGI handler reads the body on the event loop
+before the view runs. Each slow client sends a well-formed CSRF cookie, so the body is always read and the
+request is then refused with a 403.
+
+Run it against one server:
+
+    DJANGO_SETTINGS_MODULE=butter_split.settings.dev gunicorn butter_split.wsgi:application --bind 127.0.0.1:8000 --workers 4
+
+    python benchmarks/slow_clients.py http://127.0.0.1:8000/event/list --slow-clients 200
+
+or let it start gunicorn with sync workers and uvicorn with ASYNC_VIEWS off and on in turn, from the
+repository root, and print them side by side:
+
+    python benchmarks/slow_clients.py http://127.0.0.1:8000/event/list --matrix --workers 4
+
+Only the standard library is used, so it can run from any machine that can reach the server.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import string
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+SERVERS = (
+    ('gunicorn sync', '0', ['gunicorn', 'butter_split.wsgi:application', '--bind', '{host}:{port}', '--workers', '{workers}']),
+    ('uvicorn ASYNC_VIEWS=0', '0', ['uvicorn', 'butter_split.asgi:application', '--host', '{host}', '--port', '{port}', '--workers', '{workers}']),
+    ('uvicorn ASYNC_VIEWS=1', '1', ['uvicorn', 'butter_split.asgi:application', '--host', '{host}', '--port', '{port}', '--workers', '{workers}']),
+)
+
+
+def get_path(url: str) -> str:
+    parts = urlsplit(url)
+    path = parts.path or '/'
+
+    return f'{path}?{parts.query}' if parts.query else path
+
+
+def build_request(url: str) -> bytes:
+    return (
+        f'GET {get_path(url)} HTTP/1.1\r\n'
+        f'Host: {urlsplit(url).netloc}\r\n'
+        'User-Agent: butter-split-benchmark\r\n'
+        'Connection: close\r\n'
+        '\r\n'
+    ).encode()
+
+
+def build_upload(url: str, body_size: int) -> tuple[bytes, bytes]:
+    # any 32 letters and digits pass the CSRF cookie format check, which is what makes Django read the body
+    secret = ''.join(random.choices(string.ascii_letters + string.digits, k=32))
+    body = f'csrfmiddlewaretoken={secret}&name='.encode()
+    body += b'a' * max(body_size - len(body), 0)
+    headers = (
+        f'POST {get_path(url)} HTTP/1.1\r\n'
+        f'Host: {urlsplit(url).netloc}\r\n'
+        'User-Agent: butter-split-benchmark\r\n'
+        f'Cookie: csrftoken={secret}\r\n'
+        'Content-Type: application/x-www-form-urlencoded\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        'Connection: close\r\n'
+        '\r\n'
+    ).encode()
+
+    return headers, body
+
+
+async def open_connection(url: str):
+    parts = urlsplit(url)
+
+    return await asyncio.open_connection(parts.hostname, parts.port or 80)
+
+
+async def slow_client(url: str, body_size: int, byte_interval: float, stop: asyncio.Event):
+    # keeps a sync worker busy for as long as the upload lasts
+    headers, body = build_upload(url, body_size)
+
+    while not stop.is_set():
+        try:
+            reader, writer = await open_connection(url)
+        except OSError:
+            await asyncio.sleep(byte_interval)
+            continue
+
+        try:
+            writer.write(headers)
+            await writer.drain()
+
+            for byte in body:
+                if stop.is_set():
+                    break
+
+                writer.write(bytes([byte]))
+                await writer.drain()
+                await asyncio.sleep(byte_interval)
+
+            await reader.read()
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+
+async def probe(url: str, timeout: float) -> float | None:
+    started_at = time.perf_counter()
+
+    try:
+        reader, writer = await asyncio.wait_for(open_connection(url), timeout)
+        writer.write(build_request(url))
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    if not status_line.startswith(b'HTTP/1.1 2'):
+        return None
+
+    return time.perf_counter() - started_at
+
+
+async def run(options):
+    stop = asyncio.Event()
+    slow_clients = [
+        asyncio.create_task(slow_client(options.url, options.body_size, options.byte_interval, stop))
+        for _ in range(options.slow_clients)
+    ]
+
+    # let the slow clients occupy their connections first
+    await asyncio.sleep(options.warmup)
+
+    latencies = []
+
+    for _ in range(options.probes):
+        latencies.append(await probe(options.url, options.timeout))
+
+    stop.set()
+
+    for task in slow_clients:
+        task.cancel()
+
+    await asyncio.gather(*slow_clients, return_exceptions=True)
+
+    return latencies
+
+
+def summarize(latencies: list[float | None]) -> dict:
+    succeeded = sorted(latency for latency in latencies if latency is not None)
+    summary = {'succeeded': len(succeeded), 'probes': len(latencies), 'median': None, 'p95': None, 'max': None}
+
+    if succeeded:
+        summary['median'] = statistics.median(succeeded) * 1000
+        summary['p95'] = succeeded[min(len(succeeded) - 1, int(len(succeeded) * 0.95))] * 1000
+        summary['max'] = succeeded[-1] * 1000
+
+    return summary
+
+
+def format_ms(value: float | None) -> str:
+    return '-' if value is None else f'{value:.1f}'
+
+
+def report(rows: list[tuple[str, dict]], options):
+    print(f'{options.url} with {options.slow_clients} slow uploads of {options.body_size} bytes, {options.timeout}s timeout')
+    print(f'{"server":<24} {"ok":>9} {"median ms":>10} {"p95 ms":>10} {"max ms":>10}')
+
+    for name, summary in rows:
+        print(
+            f'{name:<24} {summary["succeeded"]:>4}/{summary["probes"]:<4} {format_ms(summary["median"]):>10} '
+            f'{format_ms(summary["p95"]):>10} {format_ms(summary["max"]):>10}'
+        )
+
+
+def wait_until_up(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if asyncio.run(probe(url, 1.0)) is not None:
+            return
+
+        time.sleep(0.2)
+
+    raise RuntimeError(f'{url} did not answer within {timeout}s')
+
+
+def run_matrix(options) -> list[tuple[str, dict]]:
+    parts = urlsplit(options.url)
+    rows = []
+
+    for name, async_views, command in SERVERS:
+        command = [arg.format(host=parts.hostname, port=parts.port or 80, workers=options.workers) for arg in command]
+        env = {
+            **os.environ,
+            'ASYNC_VIEWS': async_views,
+            'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'butter_split.settings.dev'),
+        }
+        server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        try:
+            wait_until_up(options.url, 30.0)
+            rows.append((name, summarize(asyncio.run(run(options)))))
+        finally:
+            server.terminate()
+            server.wait()
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--slow-clients', type=int, default=100)
+    parser.add_argument('--body-size', type=int, default=64, help='Bytes in each slow upload.')
+    parser.add_argument('--byte-interval', type=float, default=0.5, help='Seconds between body bytes.')
+    parser.add_argument('--probes', type=int, default=50)
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--matrix', action='store_true', help='Start each server of the comparison in turn.')
+    parser.add_argument('--workers', type=int, default=4, help='Workers of each server started by --matrix.')
+    options = parser.parse_args()
+
+    if options.matrix:
+        rows = run_matrix(options)
+    else:
+        rows = [(urlsplit(options.url).netloc, summarize(asyncio.run(run(options))))]
+
+    report(rows, options)
+
+    if not any(summary['succeeded'] for _, summary in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,4 +9,6 @@ pip install -r requirements.txt
 python manage.py collectstatic --no-input
 
 # Apply any outstanding database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+# Create the table of a database session cache, if SESSION_CACHE_BACKEND uses one
+python manage.py createcachetable
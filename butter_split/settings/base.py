@@ -33,25 +33,31 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django_extensions',
-    'debug_toolbar',
     'widget_tweaks',
     'service',
 ]
 
 MIDDLEWARE = [
+    'service.middleware.RequestMetricsMiddleware',
+    'service.middleware.QueryBudgetMiddleware',
+    'service.middleware.SlowQueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'service.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'service.middleware.PrimaryStickinessMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'service.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'butter_split.urls'
 
+# Serve the read-only pages with the views from service.async_views; only useful under ASGI (uvicorn).
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '').lower() in ('1', 'true', 'yes')
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -81,6 +87,113 @@ DATABASES = {
     }
 }
 
+# Read-only views decorated with service.routers.replica_reads are served from one of these aliases;
+# everything else, and any client that wrote within REPLICA_STICKY_SECONDS, uses the primary.
+DATABASE_ROUTERS = ['service.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+# service.middleware.QueryBudgetMiddleware logs requests that run more queries than their view's budget.
+# The hot pages have fixed budgets that must not grow with the data, service/tests/test_query_budget.py holds them to it.
+QUERY_BUDGETS = {
+    'service:index': 3,
+    'service:event-list': 3,
+    'service:event-detail': 8,
+    'service:event-calculate': 5,
+}
+QUERY_BUDGET_DEFAULT = int(os.environ.get('QUERY_BUDGET_DEFAULT', 30))
+
+# Metrics, served in the Prometheus text format at /metrics.
+# Under gunicorn point METRICS_MULTIPROC_DIR at a directory shared by the workers and empty it on every deploy;
+# each worker writes its values there at most every METRICS_FLUSH_SECONDS and a scrape sums them.
+# The endpoint is closed by default: scrapers send "Authorization: Bearer <METRICS_TOKEN>" or come from one of
+# the comma separated METRICS_ALLOWED_IPS, and staff users can read it in the browser.
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()]
+
+# Profiling, off unless PROFILING_DIR is set. Staff profile a request with the "X-Profile: cprofile|sample" header
+# or ?profile=cprofile|sample, and PROFILING_SAMPLE_RATE (0.01 is 1%) samples real traffic with the stack sampler.
+# Merge the files of one view with manage.py combine_profiles. Under ASGI only sync views are profiled,
+# the async views of ASYNC_VIEWS share the event loop with other requests and are passed through.
+PROFILING_DIR = os.environ.get('PROFILING_DIR')
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+PROFILING_DEFAULT_PROFILER = os.environ.get('PROFILING_DEFAULT_PROFILER', 'cprofile')
+
+# Slow query log, off unless SLOW_QUERY_THRESHOLD_MS is set. Every query at least that slow is written to
+# SLOW_QUERY_LOG_FILE as one JSON document per line, with its view and, for reads, its EXPLAIN plan.
+# Each process writes and rotates its own file, named after SLOW_QUERY_LOG_FILE with its pid appended.
+# SLOW_QUERY_EXPLAIN_ANALYZE=1 runs EXPLAIN ANALYZE on PostgreSQL, which executes the slow read a second time.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ['SLOW_QUERY_THRESHOLD_MS']) if os.environ.get('SLOW_QUERY_THRESHOLD_MS') else None
+SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', BASE_DIR / 'logs' / 'slow_queries.log')
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))
+SLOW_QUERY_LOG_BACKUP_COUNT = int(os.environ.get('SLOW_QUERY_LOG_BACKUP_COUNT', 5))
+SLOW_QUERY_EXPLAIN_ANALYZE = os.environ.get('SLOW_QUERY_EXPLAIN_ANALYZE', '').lower() in ('1', 'true', 'yes')
+# Query parameters are only logged with SLOW_QUERY_LOG_PARAMS=1, and never for session and user tables.
+SLOW_QUERY_LOG_PARAMS = os.environ.get('SLOW_QUERY_LOG_PARAMS', '').lower() in ('1', 'true', 'yes')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The local-memory backend evicts least recently used entries once MAX_ENTRIES is reached.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    'settlements': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'settlements',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SETTLEMENT_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+    # used by {% cache %}; fragment keys carry the event version, so entries never go stale
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template_fragments',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('TEMPLATE_FRAGMENT_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    # process local unless SESSION_CACHE_BACKEND points it at a cache every worker shares, see below
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+
+# e.g. SESSION_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache SESSION_CACHE_LOCATION=redis://127.0.0.1:6379
+SESSION_CACHE_BACKEND = os.environ.get('SESSION_CACHE_BACKEND')
+
+if SESSION_CACHE_BACKEND:
+    CACHES['sessions'] = {
+        'BACKEND': SESSION_CACHE_BACKEND,
+        'LOCATION': os.environ['SESSION_CACHE_LOCATION'],
+    }
+
+
+# Sessions
+# cached_db reads from the 'sessions' cache and only falls back to the database on a miss. It needs a cache
+# shared by all workers: with a per-process cache, a logout or flush() in one worker leaves the session alive
+# in the others. Without a shared cache the database engine is used; set
+# SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies to keep no server-side state.
+
+CACHED_SESSION_ENGINES = ('django.contrib.sessions.backends.cache', 'django.contrib.sessions.backends.cached_db')
+
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if SESSION_CACHE_BACKEND else 'django.contrib.sessions.backends.db',
+)
+SESSION_CACHE_ALIAS = 'sessions'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -13,6 +13,14 @@ ALLOWED_HOSTS = [
     '127.0.0.1'
 ]
 
+# the toolbar is a development aid only: it records every query and stack trace of every request
+INSTALLED_APPS += ['debug_toolbar']
+MIDDLEWARE += ['debug_toolbar.middleware.DebugToolbarMiddleware']
+
+# runserver is a single process, so its local-memory session cache is seen by every request
+if 'SESSION_ENGINE' not in os.environ:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 DATABASES = {
@@ -20,4 +28,15 @@ DATABASES = {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
     }
-}
\ No newline at end of file
+}
+
+# A copy of db.sqlite3 stands in for a replica: SQLITE_REPLICA_NAME=db.replica.sqlite3
+if os.environ.get('SQLITE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.environ['SQLITE_REPLICA_NAME'],
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    DATABASE_REPLICAS = ['replica']
@@ -1,3 +1,5 @@
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -21,4 +23,19 @@ DATABASES = {
         'HOST': os.environ['POSTGRES_HOST'],
         'PORT': os.environ['POSTGRES_DB_PORT'],
     }
-}
\ No newline at end of file
+}
+
+# Comma separated hosts of streaming replicas, which share the primary's credentials
+for index, host in enumerate(filter(None, os.environ.get('POSTGRES_REPLICA_HOSTS', '').split(','))):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+
+# gunicorn runs several workers, a session cache private to each of them would keep logged out sessions alive
+if SESSION_ENGINE in CACHED_SESSION_ENGINES and CACHES['sessions']['BACKEND'].endswith('LocMemCache'):
+    raise ImproperlyConfigured(f'{SESSION_ENGINE} needs SESSION_CACHE_BACKEND set to a cache shared by all workers.')
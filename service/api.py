@@ -0,0 +1,229 @@
+import functools
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, QuerySet
+from django.http import HttpRequest, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+
+from .conditional import event_condition, get_request_event
+from .importers import ExpenseRowValidator
+from .models import ApiToken, Event, Expense, Participant
+from .pagination import CursorPaginator
+from .routers import replica_reads
+from .search import get_search_backend
+from .sessions import get_anonymous_id
+from .settlement_cache import get_event_settlements
+
+API_EVENTS_PER_PAGE = 20
+API_EXPENSES_PER_PAGE = 50
+PAGINATION_FIELDS = ('id', 'created_at')
+API_TOKEN_PREFIX = 'Token '
+
+# public field name -> lookup; rows are read with .values(), never as model instances.
+# Names must not shadow model fields, .values() refuses such aliases.
+EVENT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'currency_code': 'currency__code',
+    'currency_symbol': 'currency__symbol',
+    'total_expenses_amount': 'total_expenses_amount',
+    'expenses_count': 'expenses_count',
+    'participants_count': 'participants_count',
+    'version': 'version',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+EVENT_DETAIL_FIELDS = {**EVENT_FIELDS, 'participants': None}
+EXPENSE_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'amount': 'amount',
+    'payer_id': 'payer_id',
+    'payer_name': 'payer__name',
+    'created_at': 'created_at',
+}
+
+
+def error_response(message: str, status: int) -> JsonResponse:
+    return JsonResponse({'error': message}, status=status)
+
+
+class ApiCsrfCheck(CsrfViewMiddleware):
+    def _reject(self, request, reason):
+        return error_response(f'CSRF check failed: {reason}', 403)
+
+
+def api_authentication(view):
+    # Integrations send "Authorization: Token <key>" and need no CSRF token, which only protects cookies.
+    # Without the header the browser session is used, and unsafe methods still need the CSRF token.
+    @functools.wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> JsonResponse:
+        authorization = request.headers.get('Authorization')
+
+        if authorization is None:
+            rejected = ApiCsrfCheck(view).process_view(request, None, (), {})
+
+            return rejected or view(request, *args, **kwargs)
+
+        user = None
+
+        if authorization.startswith(API_TOKEN_PREFIX):
+            user = ApiToken.get_user(authorization.removeprefix(API_TOKEN_PREFIX).strip())
+
+        if user is None:
+            response = error_response('Invalid API token.', 401)
+            response['WWW-Authenticate'] = API_TOKEN_PREFIX.strip()
+
+            return response
+
+        request.user = user
+
+        return view(request, *args, **kwargs)
+
+    return csrf_exempt(wrapper)
+
+
+def get_fields(request: HttpRequest, available: dict) -> list[str]:
+    # sparse fieldsets: ?fields=id,name
+    requested = request.GET.get('fields')
+
+    if not requested:
+        return list(available)
+
+    fields = list(dict.fromkeys(field.strip() for field in requested.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in available]
+
+    if unknown:
+        raise ValidationError(f'Unknown fields: {", ".join(unknown)}.')
+
+    return fields
+
+
+def select_values(queryset: QuerySet, fields: list[str], available: dict, required: tuple = ()) -> QuerySet:
+    lookups = {field: available[field] for field in (*fields, *required) if available[field] is not None}
+    names = [field for field, lookup in lookups.items() if field == lookup]
+    expressions = {field: F(lookup) for field, lookup in lookups.items() if field != lookup}
+
+    return queryset.values(*names, **expressions)
+
+
+def paginated_response(request: HttpRequest, queryset: QuerySet, fields: list[str], per_page: int) -> JsonResponse:
+    page = CursorPaginator(queryset, per_page).get_page(request.GET.get('cursor'))
+
+    return JsonResponse({
+        'results': [{field: row[field] for field in fields} for row in page],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+    })
+
+
+@api_authentication
+@require_GET
+@replica_reads
+def event_list_api(request: HttpRequest) -> JsonResponse:
+    try:
+        fields = get_fields(request, EVENT_FIELDS)
+    except ValidationError as error:
+        return error_response(error.message, 400)
+
+    if request.user.is_authenticated:
+        queryset = Event.objects.filter(owner=request.user)
+    else:
+        queryset = Event.objects.filter(owner=None, session_id=get_anonymous_id(request))
+
+    if name := request.GET.get('name', '').strip():
+        queryset = get_search_backend().filter(queryset, name)
+
+    queryset = select_values(queryset, fields, EVENT_FIELDS, required=PAGINATION_FIELDS)
+
+    return paginated_response(request, queryset, fields, API_EVENTS_PER_PAGE)
+
+
+@api_authentication
+@require_GET
+@replica_reads
+@cache_control(private=True, no_cache=True)
+@event_condition
+def event_detail_api(request: HttpRequest, pk: int) -> JsonResponse:
+    try:
+        fields = get_fields(request, EVENT_DETAIL_FIELDS)
+    except ValidationError as error:
+        return error_response(error.message, 400)
+
+    event = select_values(Event.objects.filter(pk=pk), fields, EVENT_DETAIL_FIELDS).first()
+
+    if event is None:
+        return error_response('Event not found.', 404)
+
+    if 'participants' in fields:
+        event['participants'] = list(Participant.objects.filter(events=pk).order_by('pk').values('id', 'name'))
+
+    return JsonResponse({field: event[field] for field in fields})
+
+
+@api_authentication
+@require_http_methods(['GET', 'POST'])
+@replica_reads
+def event_expenses_api(request: HttpRequest, pk: int) -> JsonResponse:
+    if request.method == 'POST':
+        return create_expense(request, pk)
+
+    try:
+        fields = get_fields(request, EXPENSE_FIELDS)
+    except ValidationError as error:
+        return error_response(error.message, 400)
+
+    if not Event.objects.filter(pk=pk).exists():
+        return error_response('Event not found.', 404)
+
+    queryset = select_values(Expense.objects.filter(event=pk), fields, EXPENSE_FIELDS, required=PAGINATION_FIELDS)
+
+    return paginated_response(request, queryset, fields, API_EXPENSES_PER_PAGE)
+
+
+def create_expense(request: HttpRequest, pk: int) -> JsonResponse:
+    event = Event.objects.filter(pk=pk).first()
+
+    if event is None:
+        return error_response('Event not found.', 404)
+
+    if not event.is_user_can_manage(request):
+        return error_response('You do not have permission to add expenses to this event.', 403)
+
+    try:
+        data = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return error_response('Request body must be a JSON object.', 400)
+
+    try:
+        expense = ExpenseRowValidator(event)(data)
+        expense.save()
+    except ValidationError as error:
+        return error_response(' '.join(error.messages), 400)
+
+    row = select_values(Expense.objects.filter(pk=expense.pk), list(EXPENSE_FIELDS), EXPENSE_FIELDS).get()
+
+    return JsonResponse(row, status=201)
+
+
+@api_authentication
+@require_GET
+@replica_reads
+@cache_control(private=True, no_cache=True)
+@event_condition
+def event_settlements_api(request: HttpRequest, pk: int) -> JsonResponse:
+    event = get_request_event(request, pk)
+
+    if event is None:
+        return error_response('Event not found.', 404)
+
+    return JsonResponse({
+        'event': event.pk,
+        'version': event.version,
+        'currency_code': event.currency.code,
+        'settlements': get_event_settlements(event),
+    })
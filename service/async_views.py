@@ -0,0 +1,177 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.cache import cache_control
+
+from .conditional import aevent_condition, aget_request_event
+from .forms import EventDetailForm, EventListSearchForm, ExpenseForm
+from .models import Currency, Event, Expense
+from .pagination import CursorPaginator
+from .routers import replica_reads
+from .search import get_search_backend
+from .sessions import aget_anonymous_id
+from .settlement_cache import aget_event_settlements
+from .views import EXPENSES_PER_PAGE, MAX_EVENT_CHIPS, EventDetailView, EventListView
+
+# Async counterparts of the read-only pages, served instead of the views in service.views when
+# settings.ASYNC_VIEWS is on. Everything the templates render is loaded up front with the async ORM,
+# so rendering never touches the database from the event loop.
+
+FRAGMENT_CACHE_ALIAS = 'template_fragments'
+
+sync_event_detail_view = sync_to_async(EventDetailView.as_view())
+
+
+async def load_user(request: HttpRequest):
+    # templates and the context processors read request.user, which would be loaded synchronously
+    request.user = await request.auser()
+
+    return request.user
+
+
+def freeze_choices(field, objects):
+    # model choice fields query their queryset while rendering, the choices are fixed in advance instead
+    choices = [(obj.pk, field.label_from_instance(obj)) for obj in objects]
+
+    if field.empty_label is not None:
+        choices.insert(0, ('', field.empty_label))
+
+    field.choices = choices
+
+
+@replica_reads
+async def index(request: HttpRequest) -> HttpResponse:
+    user = await load_user(request)
+
+    if user.is_authenticated:
+        event_chips = Event.objects.filter(owner=user)
+    else:
+        event_chips = Event.objects.filter(owner=None, session_id=await aget_anonymous_id(request))
+
+    event_chips = [event async for event in event_chips.order_by('-created_at').only('id', 'name')[:MAX_EVENT_CHIPS + 1]]
+
+    context = {
+        'event_chips': event_chips[:MAX_EVENT_CHIPS],
+        'max_event_chips': MAX_EVENT_CHIPS,
+        'is_max_events_reached': len(event_chips) > MAX_EVENT_CHIPS,
+    }
+
+    return render(request, 'pages/index.html', context=context)
+
+
+@replica_reads
+async def event_list_view(request: HttpRequest) -> HttpResponse:
+    user = await load_user(request)
+    form = EventListSearchForm(request.GET)
+
+    if user.is_authenticated:
+        queryset = Event.objects.filter(owner=user)
+    else:
+        queryset = Event.objects.filter(owner=None, session_id=await aget_anonymous_id(request))
+
+    ordering = ('-created_at', '-id')
+
+    if form.is_valid() and form.cleaned_data.get('name'):
+        # the backend is picked by introspecting the database once per process
+        search_backend = await sync_to_async(get_search_backend)()
+        queryset = search_backend.ranked(queryset, form.cleaned_data['name'])
+        ordering = search_backend.rank_ordering
+
+    paginator = CursorPaginator(queryset.select_related('currency'), EventListView.paginate_by, ordering)
+    page = await paginator.aget_page(request.GET.get('cursor'))
+
+    context = {
+        'paginator': paginator,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages(),
+        'object_list': page.object_list,
+        'event_list': page.object_list,
+        'search_form': EventListSearchForm(initial=request.GET),
+    }
+
+    return render(request, 'pages/event_list.html', context)
+
+
+@replica_reads
+@cache_control(private=True, no_cache=True)
+@aevent_condition
+async def event_detail_get_view(request: HttpRequest, pk: int) -> HttpResponse:
+    await load_user(request)
+    await aget_anonymous_id(request)
+
+    event = await (
+        Event.objects
+            .select_related('owner', 'currency')
+            .prefetch_related('participants')
+            .filter(pk=pk)
+            .afirst()
+    )
+
+    if event is None:
+        raise Http404()
+
+    participants = list(event.participants.all())
+    currencies = [currency async for currency in Currency.objects.all()]
+
+    form = EventDetailForm(instance=event)
+    freeze_choices(form.fields['currency'], currencies)
+
+    expense_form = ExpenseForm(event=event)
+    freeze_choices(expense_form.fields['payer'], participants)
+
+    paginator = CursorPaginator(Expense.objects.filter(event=event).select_related('payer'), EXPENSES_PER_PAGE)
+    expense_cursor = paginator.clean_cursor(request.GET.get('cursor'))
+
+    context = {
+        'event': event,
+        'object': event,
+        'form': form,
+        'expense_form': expense_form,
+        'can_manage': event.is_user_can_manage(request),
+        'expense_cursor': expense_cursor,
+    }
+    # the vary_on values of the {% cache %} tag around the expense list in pages/event_detail.html
+    fragment_key = make_template_fragment_key(
+        'event_expenses',
+        [event.id, event.version, expense_cursor, context['can_manage']],
+    )
+
+    if event.expenses_count and await caches[FRAGMENT_CACHE_ALIAS].ahas_key(fragment_key):
+        # The cached list is rendered without the page. Should the entry be gone by the time the template
+        # reads it, the page is loaded lazily, which is why this render runs in a thread.
+        context['expense_page'] = SimpleLazyObject(lambda: paginator.get_page(expense_cursor))
+
+        return await sync_to_async(render)(request, 'pages/event_detail.html', context)
+
+    context['expense_page'] = await paginator.aget_page(expense_cursor)
+
+    return render(request, 'pages/event_detail.html', context)
+
+
+async def event_detail_view(request: HttpRequest, pk: int) -> HttpResponse:
+    if request.method in ('GET', 'HEAD'):
+        return await event_detail_get_view(request, pk)
+
+    # adding and deleting expenses stays on the synchronous view
+    return await sync_event_detail_view(request, pk=pk)
+
+
+@replica_reads
+@cache_control(private=True, no_cache=True)
+@aevent_condition
+async def event_calculate_view(request: HttpRequest, pk: int) -> HttpResponse:
+    await load_user(request)
+    event = await aget_request_event(request, pk)
+
+    if event is None:
+        raise Http404()
+
+    context = {
+        'event': event,
+        'settlements': await aget_event_settlements(event),
+    }
+
+    return render(request, 'pages/event-calculate-page.html', context)
@@ -0,0 +1,212 @@
+import platform
+import random
+import statistics
+import subprocess
+import time
+from typing import Callable
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponseBase
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .forms import EventForm
+from .models import Event
+from .seeding import SEED_USER_PASSWORD, SeedConfig, seed
+from .settlement_cache import get_event_settlements
+from .views import EventDetailView, EventListView
+
+BENCHMARK_REPEAT = 5
+BENCHMARK_SEED = 0
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def measure(operation: Callable, repeat: int = BENCHMARK_REPEAT, setup: Callable | None = None) -> dict:
+    timings = []
+    queries = 0
+
+    for _ in range(repeat):
+        if setup:
+            setup()
+
+        with CaptureQueriesContext(connection) as context:
+            started_at = time.perf_counter()
+            response = operation()
+            timings.append(time.perf_counter() - started_at)
+
+        queries = len(context)
+
+    result = {
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+        'queries': queries,
+    }
+
+    # pages and API calls also report their payload, to compare the two for the same data
+    if isinstance(response, HttpResponseBase):
+        result['bytes'] = len(response.content)
+
+    return result
+
+
+def rolled_back(operation: Callable) -> Callable:
+    def run():
+        with transaction.atomic():
+            operation()
+            transaction.set_rollback(True)
+
+    return run
+
+
+class EventBenchmarks:
+    # Times the hot paths against the largest event of one owner: the worst case a single page has to serve.
+    def __init__(self, repeat: int = BENCHMARK_REPEAT):
+        self.repeat = repeat
+        self.event = (
+            Event.objects
+                .filter(owner__isnull=False)
+                .select_related('owner', 'currency')
+                .order_by('-expenses_count', 'pk')
+                .first()
+        )
+
+        if self.event is None:
+            raise ValueError('Benchmarks need at least one event owned by a user.')
+
+        self.user = self.event.owner
+        self.factory = RequestFactory()
+        self.client = Client()
+        self.client.login(username=self.user.username, password=SEED_USER_PASSWORD)
+        self.form_runs = 0
+
+    def run(self) -> dict:
+        benchmarks = {
+            'calculate_participants_debt': self.calculate_participants_debt,
+            'event_form_save': rolled_back(self.event_form_save),
+            'event_list_queryset': self.event_list_queryset,
+            'event_detail_queryset': self.event_detail_queryset,
+            'event_calculate_queryset': self.event_calculate_queryset,
+            'event_list_render': self.page('service:event-list'),
+            'event_detail_render': self.page('service:event-detail', pk=self.event.pk),
+            'event_calculate_render': self.page('service:event-calculate', pk=self.event.pk),
+            'event_list_api': self.page('service:api-event-list'),
+            'event_detail_api': self.page('service:api-event-detail', pk=self.event.pk),
+            'event_expenses_api': self.page('service:api-event-expenses', pk=self.event.pk),
+            'event_settlements_api': self.page('service:api-event-settlements', pk=self.event.pk),
+        }
+
+        return {
+            name: measure(operation, self.repeat, setup=clear_caches)
+            for name, operation in benchmarks.items()
+        }
+
+    def get_request(self, path: str):
+        request = self.factory.get(path)
+        request.user = self.user
+        request.session = self.client.session
+
+        return request
+
+    def calculate_participants_debt(self):
+        Event.objects.get(pk=self.event.pk).calculate_participants_debt()
+
+    def event_form_save(self):
+        self.form_runs += 1
+        names = list(self.event.participants.values_list('name', flat=True)[:5])
+        form = EventForm(
+            data={
+                'name': f'Benchmark event {self.form_runs}',
+                'currency': self.event.currency_id,
+                'participants': str(names + [f'New participant {i}' for i in range(5)]),
+            },
+            user=self.user,
+        )
+
+        if not form.is_valid():
+            raise ValueError(form.errors.as_text())
+
+        form.save()
+
+    def event_list_queryset(self):
+        view = EventListView()
+        view.setup(self.get_request(reverse('service:event-list')))
+        _, _, object_list, _ = view.paginate_queryset(view.get_queryset(), view.paginate_by)
+        list(object_list)
+
+    def event_detail_queryset(self):
+        view = EventDetailView()
+        view.setup(self.get_request(reverse('service:event-detail', kwargs={'pk': self.event.pk})), pk=self.event.pk)
+        view.object = view.get_object()
+        context = view.get_context_data(object=view.object)
+        list(context['expense_page'].object_list)
+
+    def event_calculate_queryset(self):
+        get_event_settlements(Event.objects.select_related('currency').get(pk=self.event.pk))
+
+    def page(self, name: str, **kwargs) -> Callable:
+        url = reverse(name, kwargs=kwargs or None)
+
+        def render():
+            response = self.client.get(url)
+
+            if response.status_code != 200:
+                raise ValueError(f'{url} answered {response.status_code}.')
+
+            return response
+
+        return render
+
+
+def run_size(config: SeedConfig, repeat: int = BENCHMARK_REPEAT, seed_value: int = BENCHMARK_SEED) -> dict:
+    # everything seeded for one size is rolled back before the next one
+    with transaction.atomic():
+        clear_caches()
+
+        started_at = time.perf_counter()
+        result = seed(config, random.Random(seed_value))
+        seed_seconds = time.perf_counter() - started_at
+
+        results = EventBenchmarks(repeat).run()
+        transaction.set_rollback(True)
+
+    clear_caches()
+
+    return {
+        'config': config._asdict(),
+        'seeded': {**result._asdict(), 'seconds': round(seed_seconds, 3)},
+        'results': results,
+    }
+
+
+def get_git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_environment() -> dict:
+    return {
+        'commit': get_git_revision(),
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
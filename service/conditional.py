@@ -0,0 +1,94 @@
+import functools
+from datetime import datetime
+
+from django.http import HttpRequest
+from django.utils.crypto import salted_hmac
+from django.views.decorators.http import condition
+
+from .models import Event
+from .sessions import aget_anonymous_id, get_anonymous_id
+
+
+def get_viewer_key(request: HttpRequest) -> str:
+    if not hasattr(request, '_conditional_viewer_key'):
+        if request.user.is_authenticated:
+            request._conditional_viewer_key = f'user:{request.user.pk}'
+        else:
+            request._conditional_viewer_key = f'session:{get_anonymous_id(request) or ""}'
+
+    return request._conditional_viewer_key
+
+
+async def aget_viewer_key(request: HttpRequest) -> str:
+    if not hasattr(request, '_conditional_viewer_key'):
+        user = await request.auser()
+
+        if user.is_authenticated:
+            request._conditional_viewer_key = f'user:{user.pk}'
+        else:
+            request._conditional_viewer_key = f'session:{await aget_anonymous_id(request) or ""}'
+
+    return request._conditional_viewer_key
+
+
+def get_request_event(request: HttpRequest, pk: int) -> Event | None:
+    # The etag and last-modified functions and the calculate view all need the event;
+    # it is looked up once per request, with the joins the calculate page renders from.
+    if not hasattr(request, '_conditional_events'):
+        request._conditional_events = {}
+
+    events = request._conditional_events
+
+    if pk not in events:
+        events[pk] = Event.objects.select_related('currency', 'settlement').filter(pk=pk).first()
+
+    return events[pk]
+
+
+async def aget_request_event(request: HttpRequest, pk: int) -> Event | None:
+    if not hasattr(request, '_conditional_events'):
+        request._conditional_events = {}
+
+    events = request._conditional_events
+
+    if pk not in events:
+        events[pk] = await Event.objects.select_related('currency', 'settlement').filter(pk=pk).afirst()
+
+    return events[pk]
+
+
+def event_etag(request: HttpRequest, pk: int, *args, **kwargs) -> str | None:
+    event = get_request_event(request, pk)
+
+    if event is None:
+        return None
+
+    # The viewer is part of the tag because pages differ per user (navbar, manage controls, CSRF token);
+    # it is hashed so that session keys never leave the server.
+    value = f'{pk}:{event.version}:{event.updated_at.isoformat()}:{get_viewer_key(request)}'
+
+    return salted_hmac('service.conditional.event_etag', value).hexdigest()[:32]
+
+
+def event_last_modified(request: HttpRequest, pk: int, *args, **kwargs) -> datetime | None:
+    event = get_request_event(request, pk)
+
+    return event.updated_at if event else None
+
+
+event_condition = condition(etag_func=event_etag, last_modified_func=event_last_modified)
+
+
+def aevent_condition(view_func):
+    # condition() calls the etag and last-modified functions synchronously, even around a coroutine;
+    # the event and the viewer are loaded with the async ORM first, so those calls only read the request.
+    conditional_view = event_condition(view_func)
+
+    @functools.wraps(view_func)
+    async def wrapper(request: HttpRequest, pk: int, *args, **kwargs):
+        await aget_request_event(request, pk)
+        await aget_viewer_key(request)
+
+        return await conditional_view(request, pk, *args, **kwargs)
+
+    return wrapper
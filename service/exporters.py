@@ -0,0 +1,118 @@
+import csv
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Event, Expense
+from .settlements import calculate_settlements
+
+EXPORT_CHUNK_SIZE = 2000
+# rows per yielded chunk, one write per row would cost a syscall each
+EXPORT_ROWS_PER_WRITE = 500
+EXPENSE_EXPORT_FIELDS = ('id', 'created_at', 'name', 'payer', 'payer_id', 'amount')
+SETTLEMENT_EXPORT_FIELDS = ('from', 'to', 'amount')
+# spreadsheets run a cell starting with one of these as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class SettlementAccumulator:
+    # Sums what every participant paid while the expenses stream past,
+    # so settlements need neither a second query nor the expenses in memory.
+    def __init__(self, event: Event):
+        self.event = event
+        self.paid = defaultdict(Decimal)
+
+    def add(self, payer_id: int, amount: Decimal):
+        self.paid[payer_id] += amount
+
+    def settlements(self) -> list[dict]:
+        if not self.paid:
+            return []
+
+        participants = list(self.event.participants.order_by('pk').values_list('pk', 'name'))
+
+        return calculate_settlements(participants, self.paid)
+
+
+def iter_expense_rows(event: Event, accumulator: SettlementAccumulator, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[tuple]:
+    rows = (
+        Expense.objects
+            .filter(event=event)
+            .order_by('created_at', 'id')
+            .values_list('id', 'created_at', 'name', 'payer__name', 'payer_id', 'amount')
+            .iterator(chunk_size=chunk_size)
+    )
+
+    for row in rows:
+        accumulator.add(row[4], row[5])
+        yield row
+
+
+def join_rows(lines: Iterator[str], size: int = EXPORT_ROWS_PER_WRITE) -> Iterator[str]:
+    buffer = []
+
+    for line in lines:
+        buffer.append(line)
+
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+
+    if buffer:
+        yield ''.join(buffer)
+
+
+class Echo:
+    # csv.writer only needs an object with write(); handing the line back lets it be yielded
+    def write(self, value: str) -> str:
+        return value
+
+
+def neutralize_formula(value):
+    # user typed names only, numbers and dates are written as they are
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+
+    return value
+
+
+def iter_csv_export(event: Event, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    accumulator = SettlementAccumulator(event)
+
+    # the header goes out before the expenses query is even sent
+    yield writer.writerow(EXPENSE_EXPORT_FIELDS)
+
+    yield from join_rows(
+        writer.writerow((expense_id, created_at.isoformat(), neutralize_formula(name), neutralize_formula(payer), payer_id, amount))
+        for expense_id, created_at, name, payer, payer_id, amount in iter_expense_rows(event, accumulator, chunk_size)
+    )
+
+    yield '\r\n'
+    yield writer.writerow(SETTLEMENT_EXPORT_FIELDS)
+
+    for settlement in accumulator.settlements():
+        yield writer.writerow([neutralize_formula(settlement[field]) for field in SETTLEMENT_EXPORT_FIELDS])
+
+
+def iter_json_export(event: Event, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    encoder = DjangoJSONEncoder()
+    accumulator = SettlementAccumulator(event)
+    header = {'id': event.pk, 'name': event.name, 'currency_code': event.currency.code}
+
+    yield f'{{"event": {encoder.encode(header)}, "expenses": ['
+
+    yield from join_rows(
+        (', ' if index else '') + encoder.encode(dict(zip(EXPENSE_EXPORT_FIELDS, row)))
+        for index, row in enumerate(iter_expense_rows(event, accumulator, chunk_size))
+    )
+
+    yield f'], "settlements": {encoder.encode(accumulator.settlements())}}}\n'
+
+
+EXPORTERS = {
+    'csv': (iter_csv_export, 'text/csv'),
+    'json': (iter_json_export, 'application/json'),
+}
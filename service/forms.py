@@ -3,6 +3,7 @@ import ast
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.db import transaction
 
 from .models import Event, Participant, Currency, Expense
 from django.core.exceptions import ValidationError
@@ -57,22 +58,47 @@ class EventForm(forms.ModelForm):
         if commit:
             event.save()
 
-        raw_participants = ast.literal_eval(self.cleaned_data.get('participants'))
-
+        raw_participants = list(dict.fromkeys(ast.literal_eval(self.cleaned_data.get('participants'))))
         creator = self.user if (self.user and self.user.is_authenticated) else None
-        if self.instance.pk:
-            for participant in event.participants.all():
-                if str(participant.name) not in raw_participants:
-                    participant.delete()
 
-        for raw_participant_name in raw_participants:
-            new_participant, _ = Participant.objects.get_or_create(
-                name=raw_participant_name,
-                creator=creator
-            )
+        with transaction.atomic():
+            current_participants = dict(event.participants.values_list('pk', 'name'))
+            current_names = set(current_participants.values())
 
-            if not new_participant in event.participants.all():
-                event.participants.add(new_participant)
+            removed_ids = [
+                participant_id
+                for participant_id, name in current_participants.items()
+                if name not in raw_participants
+            ]
+            missing_names = [name for name in raw_participants if name not in current_names]
+
+            if removed_ids:
+                event.participants.remove(*removed_ids)
+                Expense.objects.filter(event=event, payer_id__in=removed_ids).delete()
+                # participants are shared between events of the same creator, only drop the orphaned ones
+                Participant.objects.filter(pk__in=removed_ids, events__isnull=True).delete()
+
+            if missing_names:
+                participant_ids = {}
+
+                for participant_id, name in (
+                    Participant.objects
+                        .filter(creator=creator, name__in=missing_names)
+                        .order_by('pk')
+                        .values_list('pk', 'name')
+                ):
+                    participant_ids.setdefault(name, participant_id)
+
+                created_participants = Participant.objects.bulk_create([
+                    Participant(name=name, creator=creator)
+                    for name in missing_names
+                    if name not in participant_ids
+                ])
+
+                event.participants.add(
+                    *participant_ids.values(),
+                    *(participant.pk for participant in created_participants),
+                )
 
         return event
 
@@ -126,4 +152,12 @@ class ExpenseForm(forms.ModelForm):
 
     class Meta:
         model = Expense
-        fields = ('name', 'payer', 'amount',)
\ No newline at end of file
+        fields = ('name', 'payer', 'amount',)
+
+
+class ExpenseImportForm(forms.Form):
+    file = forms.FileField()
+    format = forms.ChoiceField(
+        choices=(('csv', 'CSV'), ('json', 'JSON')),
+        widget=forms.Select(),
+    )
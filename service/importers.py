@@ -0,0 +1,168 @@
+import csv
+import json
+from decimal import Decimal
+from typing import IO, Iterator, NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Event, Expense
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+JSON_READ_SIZE = 64 * 1024
+
+
+class ImportRowError(NamedTuple):
+    line: int
+    message: str
+
+
+class ImportResult(NamedTuple):
+    imported: int
+    error_count: int
+    errors: list[ImportRowError]
+
+
+def iter_csv_rows(stream: IO[str]) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(stream)
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_json_rows(stream: IO[str]) -> Iterator[tuple[int, dict]]:
+    # Accepts both a top-level array of objects and JSON Lines, decoding one object at a time
+    # so that memory stays bounded by the read size rather than the upload size.
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    line = 1
+    exhausted = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            line += buffer[position] == '\n'
+            position += 1
+
+        if position == len(buffer) or not exhausted and len(buffer) - position < JSON_READ_SIZE:
+            if exhausted:
+                return
+
+            buffer = buffer[position:]
+            position = 0
+            chunk = stream.read(JSON_READ_SIZE)
+            exhausted = not chunk
+            buffer += chunk
+            continue
+
+        try:
+            row, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            if not exhausted:
+                chunk = stream.read(JSON_READ_SIZE)
+                exhausted = not chunk
+                buffer += chunk
+                continue
+
+            raise ValidationError(f'Line {line}: invalid JSON ({error.msg}).')
+
+        yield line, row
+
+        line += buffer.count('\n', position, end)
+        position = end
+
+
+ROW_READERS = {
+    'csv': iter_csv_rows,
+    'json': iter_json_rows,
+}
+
+
+class ExpenseRowValidator:
+    def __init__(self, event: Event):
+        self.event = event
+        self.participant_ids = set()
+        self.participant_ids_by_name = {}
+        ambiguous_names = set()
+
+        for participant_id, name in event.participants.values_list('pk', 'name'):
+            self.participant_ids.add(participant_id)
+
+            if name in self.participant_ids_by_name:
+                ambiguous_names.add(name)
+            self.participant_ids_by_name[name] = participant_id
+
+        for name in ambiguous_names:
+            self.participant_ids_by_name[name] = None
+
+        self.name_field = Expense._meta.get_field('name')
+        self.amount_field = Expense._meta.get_field('amount')
+
+    def __call__(self, row: dict) -> Expense:
+        if not isinstance(row, dict):
+            raise ValidationError('Row must be an object with name, payer and amount.')
+
+        name = self.name_field.clean(str(row.get('name') or '').strip(), None)
+        amount = self.amount_field.clean(row.get('amount'), None)
+
+        if amount <= 0:
+            raise ValidationError('Amount must be > 0.')
+
+        return Expense(name=name, amount=amount, event=self.event, payer_id=self.clean_payer(row.get('payer')))
+
+    def clean_payer(self, payer) -> int:
+        payer = str(payer or '').strip()
+
+        if payer.isdigit() and int(payer) in self.participant_ids:
+            return int(payer)
+
+        if payer in self.participant_ids_by_name:
+            if self.participant_ids_by_name[payer] is None:
+                raise ValidationError(f'Payer "{payer}" is ambiguous, use the participant id instead.')
+
+            return self.participant_ids_by_name[payer]
+
+        raise ValidationError(f'Payer "{payer}" is not a participant of the event {self.event.name}.')
+
+
+def import_expenses(
+    event: Event,
+    rows: Iterator[tuple[int, dict]],
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportResult:
+    validate = ExpenseRowValidator(event)
+    errors = []
+    error_count = 0
+    imported = 0
+    total_amount = Decimal(0)
+    batch = []
+
+    with transaction.atomic():
+        for line, row in rows:
+            try:
+                expense = validate(row)
+            except ValidationError as error:
+                error_count += 1
+
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(ImportRowError(line, ' '.join(error.messages)))
+                continue
+
+            batch.append(expense)
+            total_amount += expense.amount
+
+            if len(batch) >= batch_size:
+                Expense.objects.bulk_create(batch)
+                imported += len(batch)
+                batch = []
+
+        if batch:
+            Expense.objects.bulk_create(batch)
+            imported += len(batch)
+
+        # bulk_create skips the post_save signal, so the summary and version are updated once here.
+        if imported:
+            Event.objects.filter(pk=event.pk).apply_expense_delta(total_amount, imported)
+
+    return ImportResult(imported, error_count, errors)
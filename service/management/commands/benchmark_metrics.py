@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from service.metrics import record_request, registry
+from service.query_budget import QueryCounter
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of recording metrics, and the per-query cost of counting queries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive.')
+
+        iterations = options['iterations']
+        request = RequestFactory().get(reverse('service:event-list'))
+        request.resolver_match = resolve(request.path)
+        request.query_counter = QueryCounter()
+        response = HttpResponse()
+
+        started_at = time.perf_counter()
+
+        for _ in range(iterations):
+            record_request(request, response, 0.01)
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(f'record_request: {elapsed / iterations * 1e6:.2f} us/request')
+
+        counter = QueryCounter()
+        execute = lambda sql, params, many, context: None
+
+        started_at = time.perf_counter()
+
+        for _ in range(iterations):
+            counter(execute, 'SELECT 1', (), False, {})
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(f'QueryCounter: {elapsed / iterations * 1e6:.2f} us/query')
+
+        # the benchmark must not show up in the real metrics
+        registry.reset()
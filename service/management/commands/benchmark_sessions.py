@@ -0,0 +1,59 @@
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from service.sessions import ANONYMOUS_ID_SESSION_KEY
+
+SESSION_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+
+
+class Command(BaseCommand):
+    help = 'Measure how long loading an anonymous session takes, and how many queries it costs, per session engine.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('engines', nargs='*', default=SESSION_ENGINES, help='Session engines to compare.')
+        parser.add_argument('--iterations', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive.')
+
+        for engine in options['engines']:
+            elapsed, queries = self.benchmark(engine, options['iterations'])
+
+            self.stdout.write(
+                f'{engine}: {elapsed / options["iterations"] * 1000:.3f} ms/load, '
+                f'{queries / options["iterations"]:.2f} queries/load'
+            )
+
+    def benchmark(self, engine: str, iterations: int) -> tuple[float, int]:
+        try:
+            session_store = import_module(engine).SessionStore
+        except ImportError:
+            raise CommandError(f'Unknown session engine {engine}.')
+
+        session = session_store()
+        session[ANONYMOUS_ID_SESSION_KEY] = 'benchmark'
+        session.save()
+
+        try:
+            with CaptureQueriesContext(connection) as context:
+                started_at = time.perf_counter()
+
+                for _ in range(iterations):
+                    # a fresh store per iteration, as every request gets one
+                    session_store(session_key=session.session_key).get(ANONYMOUS_ID_SESSION_KEY)
+
+                elapsed = time.perf_counter() - started_at
+        finally:
+            session.delete()
+
+        return elapsed, len(context)
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service.profiling import combine_profiles
+
+
+class Command(BaseCommand):
+    help = 'Merge request profiles into one: .prof files into a .prof, collapsed stacks into one flamegraph input.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='+', type=Path)
+        parser.add_argument('--output', type=Path, required=True)
+
+    def handle(self, *args, **options):
+        missing = [str(path) for path in options['profiles'] if not path.is_file()]
+
+        if missing:
+            raise CommandError(f'No such profiles: {", ".join(missing)}.')
+
+        try:
+            combine_profiles(options['profiles'], options['output'])
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.style.SUCCESS(f'Combined {len(options["profiles"])} profiles into {options["output"]}.'))
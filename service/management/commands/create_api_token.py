@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from service.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = 'Create an API token for a user. The key is printed once and cannot be shown again.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--name', default='default', help='What the token is for, to tell tokens apart.')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(username=options['username']).first()
+
+        if user is None:
+            raise CommandError(f'Unknown user {options["username"]}.')
+
+        token, key = ApiToken.create_token(user, options['name'])
+
+        self.stdout.write(self.style.SUCCESS(f'Created API token "{token.name}" for {user.username}.'))
+        self.stdout.write(key)
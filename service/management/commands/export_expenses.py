@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service.exporters import EXPORT_CHUNK_SIZE, EXPORTERS
+from service.models import Event
+
+
+class Command(BaseCommand):
+    help = "Stream an event's expenses, followed by its settlements, to a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int)
+        parser.add_argument('--output', type=Path, help='Defaults to stdout.')
+        parser.add_argument('--format', choices=sorted(EXPORTERS), help='Defaults to the output extension, or csv.')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.select_related('currency').get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError(f'Event {options["event_id"]} does not exist.')
+
+        output = options['output']
+        export_format = options['format'] or (output.suffix.lstrip('.').lower() if output else 'csv')
+
+        if export_format not in EXPORTERS:
+            raise CommandError(f'Unsupported format "{export_format}", use --format.')
+
+        exporter, _ = EXPORTERS[export_format]
+        chunks = exporter(event, options['chunk_size'])
+
+        if output is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with output.open('w', encoding='utf-8', newline='') as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+
+        self.stderr.write(self.style.SUCCESS(f'Exported "{event.name}" to {output}.'))
@@ -0,0 +1,46 @@
+import csv
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from service.importers import IMPORT_BATCH_SIZE, ROW_READERS, import_expenses
+from service.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Stream expenses from a CSV or JSON file into an event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', type=int)
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=sorted(ROW_READERS), help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            event = Event.objects.get(pk=options['event_id'])
+        except Event.DoesNotExist:
+            raise CommandError(f'Event {options["event_id"]} does not exist.')
+
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+
+        if file_format not in ROW_READERS:
+            raise CommandError(f'Unsupported format "{file_format}", use --format.')
+
+        with path.open(encoding='utf-8-sig', newline='') as stream:
+            try:
+                result = import_expenses(event, ROW_READERS[file_format](stream), options['batch_size'])
+            except (ValidationError, UnicodeDecodeError, csv.Error) as error:
+                raise CommandError(f'File could not be imported: {error}')
+
+        for error in result.errors:
+            self.stderr.write(f'line {error.line}: {error.message}')
+
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... and {result.error_count - len(result.errors)} more rejected rows.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.imported} expenses into "{event.name}", {result.error_count} rows rejected.'
+        ))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from service.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Rebuild denormalized event totals, expense and participant counts from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help='Only rebuild these events.')
+        parser.add_argument('--check', action='store_true', help='Only list the events whose summary is out of date.')
+
+    def handle(self, *args, **options):
+        events = Event.objects.all()
+
+        if options['event_ids']:
+            events = events.filter(pk__in=options['event_ids'])
+
+        if options['check']:
+            self.check_summaries(events)
+            return
+
+        updated = events.rebuild_summary()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt summaries for {updated} events.'))
+
+    def check_summaries(self, events):
+        # the live aggregates of with_summary() next to the stored columns, only for the events that differ
+        stale = (
+            events
+                .with_summary()
+                .filter(
+                    ~Q(participants_count=F('participant_count')) |
+                    ~Q(expenses_count=F('expense_count')) |
+                    ~Q(total_expenses_amount=F('total_amount'))
+                )
+                .order_by('pk')
+                .values_list(
+                    'pk', 'participants_count', 'participant_count', 'expenses_count', 'expense_count',
+                    'total_expenses_amount', 'total_amount',
+                )
+        )
+        count = 0
+
+        for pk, participants, live_participants, expenses, live_expenses, total, live_total in stale.iterator():
+            count += 1
+            self.stdout.write(
+                f'Event {pk}: participants {participants} != {live_participants}, '
+                f'expenses {expenses} != {live_expenses}, total {total} != {live_total}'
+            )
+
+        if count:
+            self.stdout.write(self.style.WARNING(f'{count} events have an out of date summary.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All event summaries are up to date.'))
@@ -0,0 +1,60 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from service.benchmarking import BENCHMARK_REPEAT, BENCHMARK_SEED, get_environment, run_size
+from service.seeding import SEED_SIZES
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database at several sizes and time settlements, event form saves, '
+        'the list, detail and calculate pages and their JSON API counterparts, with response sizes. '
+        'Writes the results as JSON to compare between commits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('sizes', nargs='*', default=['small', 'medium'], help=f'Any of {", ".join(SEED_SIZES)}.')
+        parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT)
+        parser.add_argument('--seed', type=int, default=BENCHMARK_SEED)
+        parser.add_argument('--output', help='JSON file to write, stdout by default.')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the test database between runs.')
+
+    def handle(self, *args, **options):
+        unknown = set(options['sizes']) - set(SEED_SIZES)
+
+        if unknown:
+            raise CommandError(f'Unknown sizes: {", ".join(sorted(unknown))}.')
+
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive.')
+
+        # never touch the real database: everything runs in the test database and is rolled back
+        old_name = connection.creation.create_test_db(verbosity=0, keepdb=options['keepdb'], serialize=False)
+
+        try:
+            with override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                DATABASE_REPLICAS=[],
+            ):
+                report = {
+                    'environment': get_environment(),
+                    'repeat': options['repeat'],
+                    'sizes': {},
+                }
+
+                for size in options['sizes']:
+                    self.stderr.write(f'Benchmarking {size}...')
+                    report['sizes'][size] = run_size(SEED_SIZES[size], options['repeat'], options['seed'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
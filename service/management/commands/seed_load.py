@@ -0,0 +1,46 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from service.seeding import SEED_BATCH_SIZE, SEED_SIZES, SeedConfig, seed
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create load test data: users, anonymous sessions, and events with skewed participants and expenses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=SEED_SIZES, help='Start from a predefined size, the options below override it.')
+        parser.add_argument('--users', type=int)
+        parser.add_argument('--sessions', type=int)
+        parser.add_argument('--events', type=int)
+        parser.add_argument('--participants', type=int, help='Mean participants per event.')
+        parser.add_argument('--expenses', type=int, help='Mean expenses per event.')
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible data shapes.')
+        parser.add_argument('--batch-size', type=int, default=SEED_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        config = SEED_SIZES[options['size']] if options['size'] else SeedConfig()
+        config = config._replace(**{
+            field: options[field]
+            for field in SeedConfig._fields
+            if options[field] is not None
+        })
+
+        if any(value < 0 for value in config):
+            raise CommandError('Counts must not be negative.')
+
+        if config.participants < 1 or config.expenses < 1:
+            raise CommandError('--participants and --expenses must be positive.')
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        started_at = time.perf_counter()
+        result = seed(config, random.Random(options['seed']), options['batch_size'])
+        elapsed = time.perf_counter() - started_at
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {result.users} users, {result.sessions} sessions, {result.events} events, '
+            f'{result.participants} participants and {result.expenses} expenses in {elapsed:.1f}s.'
+        ))
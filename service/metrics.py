@@ -0,0 +1,247 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+SIZE_BUCKETS = (2, 3, 5, 10, 20, 50, 100, 500, 1000, 5000)
+METRICS_FILE_PREFIX = 'metrics-'
+
+
+class Metric:
+    # Values live in a plain dict keyed by the label values tuple: recording costs a lock and a dict lookup.
+    type = None
+
+    def __init__(self, registry: 'Registry', name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}
+        registry.register(self)
+
+    def merge(self, values: dict, other: dict):
+        raise NotImplementedError
+
+    def samples(self, values: dict):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self.registry.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def inc_locked(self, labels: tuple = (), amount: float = 1):
+        # for callers already holding registry.lock
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def merge(self, values: dict, other: dict):
+        for labels, value in other.items():
+            values[labels] = values.get(labels, 0) + value
+
+    def samples(self, values: dict):
+        for labels, value in values.items():
+            yield f'{self.name}_total', self.labelnames, labels, value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, *args, buckets: tuple = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = buckets
+
+    def observe(self, labels: tuple, value: float):
+        with self.registry.lock:
+            self.observe_locked(labels, value)
+
+    def observe_locked(self, labels: tuple, value: float):
+        # for callers already holding registry.lock
+        state = self.values.get(labels)
+
+        if state is None:
+            # one count per bucket plus +Inf, then the sum
+            state = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def merge(self, values: dict, other: dict):
+        for labels, state in other.items():
+            if labels not in values:
+                values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            values[labels] = [mine + theirs for mine, theirs in zip(values[labels], state)]
+
+    def samples(self, values: dict):
+        labelnames = self.labelnames + ('le', )
+
+        for labels, state in values.items():
+            cumulative = 0
+
+            for bound, count in zip((*self.buckets, '+Inf'), state):
+                cumulative += count
+                yield f'{self.name}_bucket', labelnames, (*labels, format_value(bound)), cumulative
+
+            yield f'{self.name}_sum', self.labelnames, labels, state[-1]
+            yield f'{self.name}_count', self.labelnames, labels, cumulative
+
+
+class Registry:
+    # Every process keeps its own values. With METRICS_MULTIPROC_DIR set they are written to
+    # a file per process at most every METRICS_FLUSH_SECONDS, and /metrics sums all the files,
+    # so gunicorn workers report together. Files of exited workers are kept: counters never go back.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.next_flush_at = 0.0
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def register(self, metric: Metric):
+        self.metrics[metric.name] = metric
+
+    def reset(self):
+        # a forked worker must not report the values it inherited from its parent
+        self.lock = threading.Lock()
+        self.next_flush_at = 0.0
+
+        for metric in self.metrics.values():
+            metric.values = {}
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return Counter(self, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return Histogram(self, name, documentation, labelnames, buckets=buckets)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {name: dict(metric.values) for name, metric in self.metrics.items()}
+
+    def maybe_flush(self):
+        # settings are only read once per interval, this runs on every request
+        if time.monotonic() < self.next_flush_at:
+            return
+
+        if settings.METRICS_MULTIPROC_DIR:
+            self.flush()
+        else:
+            self.next_flush_at = time.monotonic() + settings.METRICS_FLUSH_SECONDS
+
+    def flush(self):
+        self.next_flush_at = time.monotonic() + settings.METRICS_FLUSH_SECONDS
+        directory = Path(settings.METRICS_MULTIPROC_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        content = {
+            name: [[list(labels), value] for labels, value in values.items()]
+            for name, values in self.snapshot().items()
+        }
+
+        # written aside and renamed, so a scrape never reads half a file
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(content, file)
+
+        os.replace(temporary, directory / f'{METRICS_FILE_PREFIX}{os.getpid()}.json')
+
+    def collect(self) -> dict:
+        if not settings.METRICS_MULTIPROC_DIR:
+            return self.snapshot()
+
+        self.flush()
+        collected = {name: {} for name in self.metrics}
+
+        for path in Path(settings.METRICS_MULTIPROC_DIR).glob(f'{METRICS_FILE_PREFIX}*.json'):
+            try:
+                content = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+
+            for name, values in content.items():
+                if name in self.metrics:
+                    self.metrics[name].merge(collected[name], {tuple(labels): value for labels, value in values})
+
+        return collected
+
+    def expose(self) -> str:
+        lines = []
+
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+
+            for sample, labelnames, labels, value in metric.samples(dict(sorted(values.items()))):
+                lines.append(f'{sample}{format_labels(labelnames, labels)} {format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labelnames: tuple[str, ...], labels: tuple) -> str:
+    if not labelnames:
+        return ''
+
+    pairs = ','.join(f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, labels))
+
+    return f'{{{pairs}}}'
+
+
+def format_value(value) -> str:
+    return value if isinstance(value, str) else repr(value)
+
+
+registry = Registry()
+
+REQUESTS = registry.counter('butter_split_requests', 'Requests by URL name, method and status.', ('view', 'method', 'status'))
+REQUEST_DURATION = registry.histogram('butter_split_request_duration_seconds', 'Request latency by URL name.', ('view', ))
+REQUEST_DB_DURATION = registry.histogram('butter_split_request_db_seconds', 'Database time per request by URL name.', ('view', ))
+REQUEST_QUERIES = registry.histogram('butter_split_request_queries', 'Queries per request by URL name.', ('view', ), QUERY_COUNT_BUCKETS)
+CACHE_REQUESTS = registry.counter('butter_split_cache_requests', 'Cache lookups by cache and result.', ('cache', 'result'))
+SETTLEMENT_DURATION = registry.histogram('butter_split_settlement_seconds', 'Time to compute the settlements of an event.')
+SETTLED_PARTICIPANTS = registry.histogram('butter_split_settled_event_participants', 'Participants of events whose settlements were computed.', buckets=SIZE_BUCKETS)
+SETTLED_EXPENSES = registry.histogram('butter_split_settled_event_expenses', 'Expenses of events whose settlements were computed.', buckets=SIZE_BUCKETS)
+
+
+def get_view_label(request) -> str:
+    # unresolved paths share one label, so scanners cannot grow the number of series
+    return request.resolver_match.view_name if request.resolver_match else 'unresolved'
+
+
+def record_request(request, response, duration: float):
+    view = get_view_label(request)
+    labels = (view, )
+    counter = getattr(request, 'query_counter', None)
+
+    # one lock for the whole request rather than one per metric
+    with registry.lock:
+        REQUESTS.inc_locked((view, request.method, str(response.status_code)))
+        REQUEST_DURATION.observe_locked(labels, duration)
+
+        if counter is not None:
+            REQUEST_QUERIES.observe_locked(labels, counter.count)
+            REQUEST_DB_DURATION.observe_locked(labels, counter.duration)
+
+    registry.maybe_flush()
+
+
+def record_settlement(event, duration: float):
+    with registry.lock:
+        SETTLEMENT_DURATION.observe_locked((), duration)
+        SETTLED_PARTICIPANTS.observe_locked((), event.participants_count)
+        SETTLED_EXPENSES.observe_locked((), event.expenses_count)
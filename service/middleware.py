@@ -0,0 +1,259 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import record_request
+from .profiling import PROFILE_HEADER, PROFILERS, choose_profiler, get_profile_path
+from .query_budget import QueryCounter, log_over_budget, wrap_connections
+from .routers import PRIMARY_STICKY_COOKIE, finish_tracking_writes, track_writes
+from .slow_queries import current_request
+
+
+class RequestMetricsMiddleware:
+    # Outermost, so the latency covers every other middleware. The query count and
+    # database time come from the counter QueryBudgetMiddleware leaves on the request.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started_at = time.perf_counter()
+        response = self.get_response(request)
+        record_request(request, response, time.perf_counter() - started_at)
+
+        return response
+
+    async def __acall__(self, request):
+        started_at = time.perf_counter()
+        response = await self.get_response(request)
+        record_request(request, response, time.perf_counter() - started_at)
+
+        return response
+
+
+class QueryBudgetMiddleware:
+    # Counts the queries and database time of every request and logs the ones over
+    # their QUERY_BUDGETS entry. Cheap enough for production: nothing is recorded per query.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        counter = request.query_counter = QueryCounter()
+
+        with ExitStack() as stack:
+            wrap_connections(stack, counter)
+            response = self.get_response(request)
+
+        log_over_budget(request, counter)
+
+        return response
+
+    async def __acall__(self, request):
+        counter = request.query_counter = QueryCounter()
+        stack = ExitStack()
+        # the ORM of async views runs in the request's sync thread, so the wrappers go on its connections
+        await sync_to_async(wrap_connections)(stack, counter)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        log_over_budget(request, counter)
+
+        return response
+
+
+class PrimaryStickinessMiddleware:
+    # After a request writes, the client reads from the primary for a short window,
+    # long enough for the replicas to catch up, so users never miss their own changes.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = track_writes()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            writes = finish_tracking_writes(token)
+
+        return self.process_response(response, writes)
+
+    async def __acall__(self, request):
+        token = track_writes()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            writes = finish_tracking_writes(token)
+
+        return self.process_response(response, writes)
+
+    def process_response(self, response, writes: list[str]):
+        if writes and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PRIMARY_STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+
+        return response
+
+
+class SlowQueryLogMiddleware:
+    # lets service.slow_queries name the view a slow query came from
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = current_request.set(request)
+
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = current_request.set(request)
+
+        try:
+            return await self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+
+class ProfilingMiddleware:
+    # Profiles the view and its template rendering into settings.PROFILING_DIR, see service.profiling.
+    # Under ASGI, Django calls the sync process_view in the thread that then runs a sync view, so the
+    # view is profiled there. Async views pass through: a profiler on the event loop thread would mix
+    # in every other request.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+
+        choice = choose_profiler(request)
+
+        if choice is None:
+            return self.get_response(request)
+
+        return self.profile(request, choice, self.get_response, request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not iscoroutinefunction(self) or iscoroutinefunction(view_func):
+            return None
+
+        choice = choose_profiler(request)
+
+        if choice is None:
+            return None
+
+        return self.profile(request, choice, render_view, view_func, request, *view_args, **view_kwargs)
+
+    def profile(self, request, choice: tuple[str, bool], function, *args, **kwargs):
+        profiler_name, requested = choice
+        profiler = PROFILERS[profiler_name]()
+        profiler.start()
+
+        try:
+            response = function(*args, **kwargs)
+        finally:
+            profiler.stop()
+
+        path = get_profile_path(request, profiler.extension)
+        profiler.write(path)
+
+        # only staff can ask for a profile, sampled requests never learn about theirs
+        if requested:
+            response[PROFILE_HEADER] = path.name
+
+        return response
+
+
+def render_view(view_func, request, *args, **kwargs):
+    # rendering is part of what a profile shows, Django's own render() of the response is then a no-op
+    response = view_func(request, *args, **kwargs)
+
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+
+    return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    # WhiteNoise is sync only, and a single sync middleware makes Django run every request,
+    # async views included, through a thread. Only static files are served from a thread here.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+
+        return await self.get_response(request)
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_event_summary(apps, schema_editor):
+    Event = apps.get_model('service', 'Event')
+    Expense = apps.get_model('service', 'Expense')
+
+    expenses = Expense.objects.filter(event=OuterRef('pk')).order_by().values('event')
+    memberships = Event.participants.through.objects.filter(event=OuterRef('pk')).order_by().values('event')
+
+    Event.objects.update(
+        participants_count=Coalesce(Subquery(memberships.annotate(count=Count('pk')).values('count')), 0),
+        expenses_count=Coalesce(Subquery(expenses.annotate(count=Count('pk')).values('count')), 0),
+        total_expenses_amount=Coalesce(
+            Subquery(expenses.annotate(total=Sum('amount')).values('total')),
+            0,
+            output_field=models.DecimalField(decimal_places=2, max_digits=14),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0009_expense_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='expenses_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='total_expenses_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=14),
+        ),
+        migrations.RunPython(backfill_event_summary, migrations.RunPython.noop),
+    ]
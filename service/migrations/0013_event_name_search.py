@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-18 11:05
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import OperationalError, migrations
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS service_event_name_trgm '
+            'ON service_event USING gin ((UPPER("name"::text)) gin_trgm_ops)'
+        )
+    elif connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE service_event_fts USING fts5(name, tokenize='unicode61', prefix='2 3')"
+            )
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to icontains
+            return
+
+        schema_editor.execute('INSERT INTO service_event_fts (rowid, name) SELECT id, name FROM service_event')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS service_event_name_trgm')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS service_event_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0012_event_updated_at_eventsettlement'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
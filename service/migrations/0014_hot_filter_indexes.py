@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('service', '0013_event_name_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='event_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('owner__isnull', True)), fields=['session_id', '-created_at', '-id'], name='event_session_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['event', '-created_at', '-id'], name='expense_event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['event', 'payer', 'amount'], name='expense_event_payer_idx'),
+        ),
+    ]
@@ -1,9 +1,20 @@
+import asyncio
+import hashlib
+import secrets
+from collections import defaultdict
+from decimal import Decimal
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.db.models import Q
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Now
+
+from .sessions import get_anonymous_id
+from .settlements import calculate_settlements
 
 
 class User(AbstractUser):
@@ -42,6 +53,79 @@ class Participant(models.Model):
         verbose_name_plural = 'Participants'
 
 
+SUMMARY_FIELDS = ('total_expenses_amount', 'expenses_count', 'participants_count', 'version')
+
+
+class EventQuerySet(models.QuerySet):
+    def apply_expense_delta(self, amount, count):
+        return self.update(
+            total_expenses_amount=F('total_expenses_amount') + amount,
+            expenses_count=F('expenses_count') + count,
+            version=F('version') + 1,
+            updated_at=Now(),
+        )
+
+    def refresh_participants_count(self):
+        return self.update(
+            participants_count=self._participants_count_subquery(),
+            version=F('version') + 1,
+            updated_at=Now(),
+        )
+
+    def with_summary(self):
+        return self.annotate(
+            participant_count=self._participants_count_subquery(),
+            expense_count=self._expenses_count_subquery(),
+            total_amount=self._expenses_total_subquery(),
+        )
+
+    def rebuild_summary(self):
+        return self.update(
+            participants_count=self._participants_count_subquery(),
+            expenses_count=self._expenses_count_subquery(),
+            total_expenses_amount=self._expenses_total_subquery(),
+            version=F('version') + 1,
+            updated_at=Now(),
+        )
+
+    # Each count is a separate correlated subquery, so the participant and expense joins never multiply each other.
+    def _participants_count_subquery(self):
+        memberships = (
+            self.model.participants.through.objects
+                .filter(event=OuterRef('pk'))
+                .order_by()
+                .values('event')
+                .annotate(count=Count('pk'))
+                .values('count')
+        )
+
+        return Coalesce(Subquery(memberships), 0)
+
+    def _expenses_count_subquery(self):
+        expenses = (
+            Expense.objects
+                .filter(event=OuterRef('pk'))
+                .order_by()
+                .values('event')
+                .annotate(count=Count('pk'))
+                .values('count')
+        )
+
+        return Coalesce(Subquery(expenses), 0)
+
+    def _expenses_total_subquery(self):
+        expenses = (
+            Expense.objects
+                .filter(event=OuterRef('pk'))
+                .order_by()
+                .values('event')
+                .annotate(total=Sum('amount'))
+                .values('total')
+        )
+
+        return Coalesce(Subquery(expenses), 0, output_field=models.DecimalField(decimal_places=2, max_digits=14))
+
+
 class Event(models.Model):
     name = models.CharField(max_length=100)
     participants = models.ManyToManyField(Participant, related_name='events')
@@ -61,7 +145,16 @@ class Event(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
     session_id = models.CharField(max_length=255, null=True, blank=True)
+    total_expenses_amount = models.DecimalField(decimal_places=2, max_digits=14, default=0, editable=False)
+    expenses_count = models.PositiveIntegerField(default=0, editable=False)
+    participants_count = models.PositiveIntegerField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = EventQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Event'
@@ -78,60 +171,129 @@ class Event(models.Model):
                 condition=Q(owner__isnull=True)
             ),
         ]
+        indexes = [
+            # admin changelist ordering and date hierarchy
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='event_created_idx',
+            ),
+            models.Index(
+                fields=['owner', '-created_at', '-id'],
+                name='event_owner_created_idx',
+            ),
+            models.Index(
+                fields=['session_id', '-created_at', '-id'],
+                name='event_session_created_idx',
+                condition=Q(owner__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # The summary columns are maintained with F() updates; never overwrite them with stale in-memory values.
+        if self._state.adding or not self.pk or kwargs.get('update_fields') is not None:
+            return super().save(*args, **kwargs)
+
+        kwargs['update_fields'] = [
+            field.name
+            for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in SUMMARY_FIELDS
+        ] + ['version']
+
+        # edits of the event itself change rendered pages too, so they bump the version as well
+        previous_version = self.version
+        self.version = F('version') + 1
+
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            self.version = previous_version
+            raise
+
+        self.version = previous_version + 1
+
     def get_total_expenses_amount(self):
         return self.expenses.aggregate(total=models.Sum('amount'))['total'] or 0
 
     def is_user_can_manage(self, request):
         if (
             (request.user.is_authenticated and self.owner and request.user.id == self.owner.pk) or
-            (self.session_id is not None and request.session.session_key == self.session_id)
+            (self.session_id is not None and get_anonymous_id(request) == self.session_id)
         ):
             return True
 
         return False
 
     def calculate_participants_debt(self):
-        if not self.expenses.count(): return []
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
 
-        participants = self.participants.annotate(
-            paid=models.Sum('expenses__amount', filter=Q(expenses__event=self)),
-        )
+        if 'expenses' in prefetched:
+            paid = defaultdict(Decimal)
+
+            for expense in self.expenses.all():
+                paid[expense.payer_id] += expense.amount
+        else:
+            paid = dict(self._paid_by_participant())
+
+        if not paid:
+            return []
 
-        balances = []
-        settlements = []
-        fair_share = self.get_total_expenses_amount() / participants.count()
+        if 'participants' in prefetched:
+            participants = sorted((participant.pk, participant.name) for participant in self.participants.all())
+        else:
+            participants = list(self._participant_names())
 
-        for participant in participants:
-            paid = participant.paid or 0
+        return calculate_settlements(participants, paid)
 
-            balance = paid - fair_share
-            balances.append({'name': participant.name, 'balance': balance})
+    async def acalculate_participants_debt(self):
+        paid = {payer_id: amount async for payer_id, amount in self._paid_by_participant()}
 
-        creditors = sorted([p for p in balances if p['balance'] > 0], key=lambda p: p['balance'])
-        debtors = sorted([p for p in balances if p['balance'] < 0], key=lambda p: p['balance'], reverse=True)
+        if not paid:
+            return []
+
+        participants = [participant async for participant in self._participant_names()]
+
+        # the matching itself is CPU bound, keep it off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, calculate_settlements, participants, paid)
+
+    def _paid_by_participant(self):
+        return (
+            self.expenses
+                .order_by()
+                .values('payer')
+                .annotate(paid=Sum('amount'))
+                .values_list('payer', 'paid')
+        )
 
-        while creditors and debtors:
-            debtor = debtors[0]
-            creditor = creditors[0]
+    def _participant_names(self):
+        return self.participants.order_by('pk').values_list('pk', 'name')
 
-            amount = min(-debtor['balance'], creditor['balance'])
 
-            settlement = {'from': debtor['name'], 'to': creditor['name'], 'amount': round(amount, 2)}
-            settlements.append(settlement)
+class EventSettlement(models.Model):
+    event = models.OneToOneField(
+        Event,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='settlement'
+    )
+    version = models.PositiveIntegerField()
+    settlements = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    computed_at = models.DateTimeField(auto_now=True)
 
-            debtor['balance'] += amount
-            creditor['balance'] -= amount
+    class Meta:
+        verbose_name = 'Event settlement'
+        verbose_name_plural = 'Event settlements'
 
-            if debtor['balance'] == 0:
-                debtors.pop(0)
-            if creditor['balance'] == 0:
-                creditors.pop(0)
+    def __str__(self):
+        return f"{self.event_id} - v{self.version}"
 
-        return settlements
+    def get_settlements(self):
+        return [
+            {**settlement, 'amount': Decimal(settlement['amount'])}
+            for settlement in self.settlements
+        ]
 
 
 class Expense(models.Model):
@@ -153,10 +315,65 @@ class Expense(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            return super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
     class Meta:
         verbose_name = 'Expense'
         verbose_name_plural = 'Expenses'
         ordering = ('-created_at',)
+        indexes = [
+            # admin changelist ordering and date hierarchy
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='expense_created_idx',
+            ),
+            models.Index(
+                fields=['event', '-created_at', '-id'],
+                name='expense_event_created_idx',
+            ),
+            # covers the grouped per-payer sums used by settlements
+            models.Index(
+                fields=['event', 'payer', 'amount'],
+                name='expense_event_payer_idx',
+            ),
+        ]
+
+
+class ApiToken(models.Model):
+    # Only a SHA-256 of the key is stored: the key itself is shown once, when the token is created.
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='api_tokens')
+    name = models.CharField(max_length=100)
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'API token'
+        verbose_name_plural = 'API tokens'
+
+    def __str__(self):
+        return f"{self.user} - {self.name}"
+
+    @staticmethod
+    def hash_key(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def create_token(cls, user, name: str) -> tuple['ApiToken', str]:
+        key = secrets.token_urlsafe(32)
+
+        return cls.objects.create(user=user, name=name, key_hash=cls.hash_key(key)), key
+
+    @classmethod
+    def get_user(cls, key: str):
+        token = cls.objects.select_related('user').filter(key_hash=cls.hash_key(key)).first()
+
+        if token is None or not token.user.is_active:
+            return None
 
+        return token.user
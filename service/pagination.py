@@ -0,0 +1,195 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+# below this many rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+class CursorPage:
+    def __init__(self, object_list: list, has_next: bool, has_previous: bool, next_cursor: str | None, previous_cursor: str | None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor if has_next else None
+        self.previous_cursor = previous_cursor if has_previous else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+# Keyset paginator: every page is one range scan on the ordering columns, so page N costs the same
+# as page 1 and no COUNT(*) is issued. The last ordering field must be unique (the primary key by default).
+# Ordering may also name annotations of the queryset, such as a search rank.
+class CursorPaginator:
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: tuple[str, ...] = ('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = []
+        self.attnames = []
+
+        for name in ordering:
+            name = name.lstrip('-')
+
+            if name in queryset.query.annotations:
+                self.fields.append(queryset.query.annotations[name].output_field)
+                self.attnames.append(name)
+            else:
+                field = queryset.model._meta.get_field(name)
+                self.fields.append(field)
+                self.attnames.append(field.attname)
+
+    def get_page(self, cursor: str | None) -> CursorPage:
+        direction, values, queryset = self.get_page_queryset(cursor)
+
+        return self.build_page(direction, values, list(queryset))
+
+    async def aget_page(self, cursor: str | None) -> CursorPage:
+        direction, values, queryset = self.get_page_queryset(cursor)
+
+        return self.build_page(direction, values, [obj async for obj in queryset])
+
+    def clean_cursor(self, cursor: str | None) -> str | None:
+        # an invalid cursor shows the first page, so it is the same as no cursor at all
+        if not cursor:
+            return None
+
+        try:
+            self.decode_cursor(cursor)
+        except ValidationError:
+            return None
+
+        return cursor
+
+    def get_page_queryset(self, cursor: str | None) -> tuple[str, list | None, QuerySet]:
+        try:
+            direction, values = self.decode_cursor(cursor) if cursor else (NEXT, None)
+        except ValidationError:
+            direction, values = NEXT, None
+
+        ordering = self.ordering if direction == NEXT else tuple(self.reverse(name) for name in self.ordering)
+        queryset = self.queryset.order_by(*ordering)
+
+        if values is not None:
+            queryset = queryset.filter(self.after(ordering, values))
+
+        return direction, values, queryset[:self.per_page + 1]
+
+    def build_page(self, direction: str, values: list | None, object_list: list) -> CursorPage:
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == PREVIOUS:
+            object_list.reverse()
+
+        if not object_list:
+            return CursorPage([], False, False, None, None)
+
+        return CursorPage(
+            object_list,
+            has_next=has_more if direction == NEXT else True,
+            has_previous=values is not None if direction == NEXT else has_more,
+            next_cursor=self.encode_cursor(NEXT, object_list[-1]),
+            previous_cursor=self.encode_cursor(PREVIOUS, object_list[0]),
+        )
+
+    def encode_cursor(self, direction: str, obj) -> str:
+        # rows of a .values() queryset are keyed by attname
+        if isinstance(obj, dict):
+            values = [obj[attname] for attname in self.attnames]
+        else:
+            values = [getattr(obj, attname) for attname in self.attnames]
+        payload = json.dumps([direction, values], default=self.encode_value, separators=(',', ':'))
+
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> tuple[str, list]:
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(payload)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise ValidationError('Invalid cursor.')
+
+        if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != len(self.fields):
+            raise ValidationError('Invalid cursor.')
+
+        return direction, [field.to_python(value) for field, value in zip(self.fields, values)]
+
+    @staticmethod
+    def encode_value(value) -> str:
+        # full precision, unlike DjangoJSONEncoder which drops microseconds
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+
+        return str(value)
+
+    @staticmethod
+    def reverse(name: str) -> str:
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    @staticmethod
+    def after(ordering: tuple[str, ...], values: list) -> Q:
+        # (a, b) after (x, y) in the given ordering: a beyond x, or a == x and b beyond y
+        condition = Q()
+
+        for index in reversed(range(len(ordering))):
+            name = ordering[index].lstrip('-')
+            lookup = 'lt' if ordering[index].startswith('-') else 'gt'
+            beyond = Q(**{f'{name}__{lookup}': values[index]})
+            condition = beyond if index == len(ordering) - 1 else beyond | (Q(**{name: values[index]}) & condition)
+
+        return condition
+
+
+class EstimatedCountPaginator(Paginator):
+    # Unfiltered admin changelists on Postgres take the row count from the planner statistics
+    # instead of scanning the whole table; filtered querysets and other databases count exactly.
+    @cached_property
+    def count(self) -> int:
+        estimate = self.estimate_count()
+
+        if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+
+        return super().count
+
+    def estimate_count(self) -> int | None:
+        queryset = self.object_list
+
+        if not isinstance(queryset, QuerySet) or queryset.query.where or queryset.query.distinct:
+            return None
+
+        connection = connections[queryset.db]
+
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+
+        # -1 until the table has been vacuumed or analyzed
+        if row is None or row[0] < 0:
+            return None
+
+        return row[0]
@@ -0,0 +1,131 @@
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAMETER = 'profile'
+SAMPLE_INTERVAL = 0.001
+
+
+class CProfileProfiler:
+    # deterministic: every call is recorded, exact but several times slower while it runs
+    extension = 'prof'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def write(self, path: Path):
+        self.profile.dump_stats(path)
+
+
+class StackSampler:
+    # Looks at the stack of the profiled thread every SAMPLE_INTERVAL from a second thread,
+    # so the request itself runs at full speed. Writes collapsed stacks, one "a;b;c count" line
+    # per distinct stack, which flamegraph.pl and speedscope read directly.
+    extension = 'collapsed'
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_id = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: Path):
+        path.write_text(''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common()))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+
+def collapse_stack(frame) -> str:
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+
+    return ';'.join(reversed(names))
+
+
+PROFILERS = {
+    'cprofile': CProfileProfiler,
+    'sample': StackSampler,
+}
+
+
+def choose_profiler(request) -> tuple[str, bool] | None:
+    # Staff ask for a profile with the X-Profile header or ?profile=, naming a profiler or not;
+    # anybody's request can be picked by PROFILING_SAMPLE_RATE, always with the cheap sampler.
+    # Returns the profiler and whether it was asked for. request.user is only read when a profile
+    # is asked for, so sampling never loads the session of an anonymous request.
+    if not settings.PROFILING_DIR:
+        return None
+
+    requested = request.headers.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAMETER)
+
+    if requested and request.user.is_staff:
+        return (requested if requested in PROFILERS else settings.PROFILING_DEFAULT_PROFILER), True
+
+    if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return 'sample', False
+
+    return None
+
+
+def get_profile_path(request, extension: str) -> Path:
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    view_name = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+
+    # the view name comes first after the time, so one view's profiles are easy to pick and combine
+    return directory / (
+        f'{timezone.now():%Y%m%dT%H%M%S}-{view_name.replace(":", "-")}-{os.getpid()}-{uuid.uuid4().hex[:8]}.{extension}'
+    )
+
+
+def combine_profiles(paths: list[Path], output: Path):
+    extensions = {path.suffix for path in paths}
+
+    if extensions == {'.prof'}:
+        pstats.Stats(*map(str, paths)).dump_stats(output)
+    elif extensions == {'.collapsed'}:
+        stacks = Counter()
+
+        for path in paths:
+            for line in path.read_text().splitlines():
+                stack, _, count = line.rpartition(' ')
+                stacks[stack] += int(count)
+
+        output.write_text(''.join(f'{stack} {count}\n' for stack, count in stacks.most_common()))
+    else:
+        raise ValueError('Profiles must all be .prof or all be .collapsed files.')
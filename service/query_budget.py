@@ -0,0 +1,52 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    # an execute wrapper: counts every query of the request and the time spent waiting on the database
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started_at
+
+
+def wrap_connections(stack: ExitStack, counter: QueryCounter):
+    # connections are thread local, so this has to run in the thread that queries
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(counter))
+
+
+def get_query_budget(view_name: str | None) -> int | None:
+    return settings.QUERY_BUDGETS.get(view_name, settings.QUERY_BUDGET_DEFAULT)
+
+
+def log_over_budget(request, counter: QueryCounter):
+    view_name = request.resolver_match.view_name if request.resolver_match else None
+    budget = get_query_budget(view_name)
+
+    if budget is None or counter.count <= budget:
+        return
+
+    logger.warning(
+        'Query budget exceeded by %s: %d queries for a budget of %d, %.1f ms in the database (%s %s)',
+        view_name or request.path,
+        counter.count,
+        budget,
+        counter.duration * 1000,
+        request.method,
+        request.path,
+    )
@@ -0,0 +1,102 @@
+import functools
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_STICKY_COOKIE = 'use_primary'
+
+# the replica chosen for the current request, set only while a replica_reads view runs
+_read_alias = ContextVar('read_alias', default=None)
+# set by PrimaryStickinessMiddleware for the duration of a request, flipped by the first write
+_request_writes = ContextVar('request_writes', default=None)
+
+
+def is_session_model(model) -> bool:
+    # sessions are written on most requests and must be read back immediately
+    return model._meta.app_label == 'sessions'
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if is_session_model(model):
+            return DEFAULT_DB_ALIAS
+
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        if not is_session_model(model):
+            # read-your-writes: the rest of this request, and the sticky window after it, read from the primary
+            _read_alias.set(None)
+
+            if (writes := _request_writes.get()) is not None:
+                writes.append(model._meta.label)
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas receive the schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+
+        return None
+
+
+def replica_reads(view_func):
+    def get_replica(request) -> str | None:
+        replicas = settings.DATABASE_REPLICAS
+
+        if not replicas or request.method not in ('GET', 'HEAD') or PRIMARY_STICKY_COOKIE in request.COOKIES:
+            return None
+
+        return random.choice(replicas)
+
+    if iscoroutinefunction(view_func):
+        @functools.wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            token = _read_alias.set(get_replica(request))
+
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        token = _read_alias.set(get_replica(request))
+
+        try:
+            response = view_func(request, *args, **kwargs)
+
+            # template responses run their queries while rendering, after the view has returned
+            if callable(getattr(response, 'render', None)) and not response.is_rendered:
+                response.render()
+
+            return response
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+def track_writes():
+    return _request_writes.set([])
+
+
+def finish_tracking_writes(token) -> list[str]:
+    writes = _request_writes.get()
+    _request_writes.reset(token)
+
+    return writes
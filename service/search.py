@@ -0,0 +1,127 @@
+import functools
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'service_event_fts'
+SEARCH_TOKEN_RE = re.compile(r'\w+')
+
+
+# Every backend finds the names containing the term anywhere, as name__icontains always did.
+# ranked() annotates search_rank where the backend can, and rank_ordering is the order of its
+# results, ending with unique columns so CursorPaginator can page through them.
+class EventSearchBackend:
+    rank_ordering = ('-created_at', '-id')
+
+    def filter(self, queryset: QuerySet, term: str) -> QuerySet:
+        return queryset.filter(name__icontains=term)
+
+    def ranked(self, queryset: QuerySet, term: str) -> QuerySet:
+        return self.filter(queryset, term).order_by(*self.rank_ordering)
+
+    def index_event(self, event):
+        pass
+
+    def index_events(self, events):
+        for event in events:
+            self.index_event(event)
+
+    def remove_event(self, event_id: int):
+        pass
+
+
+class PostgresTrigramSearchBackend(EventSearchBackend):
+    # name__icontains compiles to UPPER("name"::text) LIKE UPPER(%s), which the
+    # service_event_name_trgm GIN index (gin_trgm_ops on the same expression) serves.
+    rank_ordering = ('-search_rank', '-created_at', '-id')
+
+    def ranked(self, queryset: QuerySet, term: str) -> QuerySet:
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return (
+            self.filter(queryset, term)
+                .annotate(search_rank=TrigramWordSimilarity(term, 'name'))
+                .order_by(*self.rank_ordering)
+        )
+
+
+class SqliteFTS5SearchBackend(EventSearchBackend):
+    # FTS5 matches word prefixes, so "din ber" finds "Dinner in Berlin", but "nner" would find nothing.
+    # Names containing the term are matched as well; the user's events are few, so the LIKE stays cheap.
+    # Those names have no bm25 rank and come after the word matches.
+    rank_ordering = ('search_rank', '-created_at', '-id')
+
+    def __init__(self, using: str):
+        self.using = using
+
+    def filter(self, queryset: QuerySet, term: str) -> QuerySet:
+        match = self.match_expression(term)
+
+        if match is None:
+            return super().filter(queryset, term)
+
+        return queryset.filter(
+            Q(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])) |
+            Q(name__icontains=term)
+        )
+
+    def ranked(self, queryset: QuerySet, term: str) -> QuerySet:
+        match = self.match_expression(term)
+
+        if match is None:
+            return super().ranked(queryset, term)
+
+        # bm25 rank: lower is better and always negative, so 0 puts the substring matches last
+        rank = RawSQL(
+            f'COALESCE((SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {queryset.model._meta.db_table}.id), 0)',
+            [match],
+            output_field=FloatField(),
+        )
+
+        return (
+            self.filter(queryset, term)
+                .annotate(search_rank=rank)
+                .order_by(*self.rank_ordering)
+        )
+
+    def index_event(self, event):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name) VALUES (%s, %s)', [event.pk, event.name])
+
+    def index_events(self, events):
+        # bulk_create sends no post_save, so bulk inserted events are indexed in one statement instead
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, name) VALUES (%s, %s)',
+                [(event.pk, event.name) for event in events],
+            )
+
+    def remove_event(self, event_id: int):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [event_id])
+
+    @staticmethod
+    def match_expression(term: str) -> str | None:
+        # every word must match as a prefix
+        tokens = SEARCH_TOKEN_RE.findall(term)
+
+        if not tokens:
+            return None
+
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+
+@functools.cache
+def get_search_backend(using: str = DEFAULT_DB_ALIAS) -> EventSearchBackend:
+    connection = connections[using]
+
+    if connection.vendor == 'postgresql':
+        return PostgresTrigramSearchBackend()
+
+    # the FTS5 table is only created by the migration when SQLite was built with FTS5
+    if connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names():
+        return SqliteFTS5SearchBackend(using)
+
+    return EventSearchBackend()
@@ -0,0 +1,202 @@
+import math
+import random
+import secrets
+from datetime import timedelta
+from decimal import Decimal
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from .models import Currency, Event, Expense, Participant
+from .search import get_search_backend
+from .sessions import ANONYMOUS_ID_SESSION_KEY
+
+SEED_BATCH_SIZE = 1000
+SEED_USER_PASSWORD = 'load-user-password'
+SEED_CURRENCIES = (
+    ('USD', 'US Dollar', '$'),
+    ('EUR', 'Euro', '€'),
+    ('GBP', 'Pound Sterling', '£'),
+    ('UAH', 'Ukrainian Hryvnia', '₴'),
+)
+SESSION_KEY_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+# expense counts per event follow a Pareto tail: most events are small, a few are huge
+EXPENSES_PARETO_ALPHA = 1.5
+MAX_PARTICIPANTS_PER_EVENT = 50
+
+
+class SeedConfig(NamedTuple):
+    users: int = 10
+    sessions: int = 20
+    events: int = 100
+    # means per event, the actual numbers are skewed around them
+    participants: int = 5
+    expenses: int = 20
+
+
+class SeedResult(NamedTuple):
+    users: int
+    sessions: int
+    events: int
+    participants: int
+    expenses: int
+
+
+SEED_SIZES = {
+    'small': SeedConfig(users=10, sessions=20, events=100, participants=5, expenses=20),
+    'medium': SeedConfig(users=100, sessions=200, events=2000, participants=6, expenses=30),
+    'large': SeedConfig(users=1000, sessions=2000, events=20000, participants=8, expenses=40),
+}
+
+
+def owner_weights(count: int) -> list[float]:
+    # Zipf-like: the first owners create most of the events
+    return [1 / (rank + 1) for rank in range(count)]
+
+
+def participants_count(rng: random.Random, mean: int) -> int:
+    count = round(rng.lognormvariate(math.log(mean), 0.4))
+
+    return min(max(count, 2), MAX_PARTICIPANTS_PER_EVENT)
+
+
+def expenses_count(rng: random.Random, mean: int) -> int:
+    pareto_mean = EXPENSES_PARETO_ALPHA / (EXPENSES_PARETO_ALPHA - 1)
+
+    return min(int(mean * rng.paretovariate(EXPENSES_PARETO_ALPHA) / pareto_mean), mean * 100)
+
+
+def expense_amount(rng: random.Random) -> Decimal:
+    return max(Decimal(rng.lognormvariate(math.log(25), 1)).quantize(Decimal('0.01')), Decimal('1.00'))
+
+
+def get_currencies() -> list[Currency]:
+    for code, name, symbol in SEED_CURRENCIES:
+        Currency.objects.get_or_create(code=code, defaults={'name': name, 'symbol': symbol})
+
+    return list(Currency.objects.order_by('pk'))
+
+
+def create_users(count: int, batch_size: int) -> list:
+    user_model = get_user_model()
+    # hashing once keeps seeding fast, every load user logs in with SEED_USER_PASSWORD
+    password = make_password(SEED_USER_PASSWORD)
+    offset = user_model.objects.count()
+
+    return user_model.objects.bulk_create(
+        [user_model(username=f'load-user-{offset + i}', password=password) for i in range(count)],
+        batch_size=batch_size,
+    )
+
+
+def create_sessions(count: int, batch_size: int) -> list[str]:
+    store = SessionStore()
+    expire_date = timezone.now() + timedelta(seconds=settings.SESSION_COOKIE_AGE)
+    anonymous_ids = [secrets.token_urlsafe(24) for _ in range(count)]
+
+    Session.objects.bulk_create(
+        [
+            Session(
+                session_key=get_random_string(32, SESSION_KEY_CHARS),
+                session_data=store.encode({ANONYMOUS_ID_SESSION_KEY: anonymous_id}),
+                expire_date=expire_date,
+            )
+            for anonymous_id in anonymous_ids
+        ],
+        batch_size=batch_size,
+    )
+
+    return anonymous_ids
+
+
+@transaction.atomic
+def seed(config: SeedConfig, rng: random.Random | None = None, batch_size: int = SEED_BATCH_SIZE) -> SeedResult:
+    rng = rng or random.Random()
+    currencies = get_currencies()
+    users = create_users(config.users, batch_size)
+    anonymous_ids = create_sessions(config.sessions, batch_size)
+
+    owners = [(user, None) for user in users] + [(None, anonymous_id) for anonymous_id in anonymous_ids]
+
+    if not owners:
+        return SeedResult(len(users), len(anonymous_ids), 0, 0, 0)
+
+    rng.shuffle(owners)
+    event_owners = rng.choices(range(len(owners)), weights=owner_weights(len(owners)), k=config.events)
+
+    # every owner splits bills with the same circle of friends, so participants are shared between their events
+    circle_sizes = {index: participants_count(rng, config.participants) * 2 for index in set(event_owners)}
+    circles = {}
+    participants = []
+
+    for index, size in circle_sizes.items():
+        owner, _ = owners[index]
+        circles[index] = [Participant(name=f'Friend {index}-{j}', creator=owner) for j in range(size)]
+        participants.extend(circles[index])
+
+    Participant.objects.bulk_create(participants, batch_size=batch_size)
+
+    events = [
+        Event(
+            name=f'Event {i}',
+            currency=rng.choice(currencies),
+            owner=owners[index][0],
+            session_id=owners[index][1],
+        )
+        for i, index in enumerate(event_owners)
+    ]
+    Event.objects.bulk_create(events, batch_size=batch_size)
+    get_search_backend().index_events(events)
+
+    memberships = []
+    expenses = []
+    expenses_total = 0
+
+    for event, index in zip(events, event_owners):
+        circle = circles[index]
+        members = rng.sample(circle, min(participants_count(rng, config.participants), len(circle)))
+        # whoever holds the card pays most of the time
+        payer_weights = [1 / (rank + 1) for rank in range(len(members))]
+
+        memberships.extend(
+            Event.participants.through(event_id=event.pk, participant_id=participant.pk)
+            for participant in members
+        )
+        event_expenses = [
+            Expense(
+                name=f'Expense {j}',
+                amount=expense_amount(rng),
+                event=event,
+                payer=rng.choices(members, weights=payer_weights)[0],
+            )
+            for j in range(expenses_count(rng, config.expenses))
+        ]
+        expenses.extend(event_expenses)
+        expenses_total += len(event_expenses)
+
+        # flush as we go so a large seed never holds every expense in memory
+        if len(expenses) >= batch_size * 10:
+            Expense.objects.bulk_create(expenses, batch_size=batch_size)
+            expenses = []
+
+    Event.participants.through.objects.bulk_create(memberships, batch_size=batch_size)
+    Expense.objects.bulk_create(expenses, batch_size=batch_size)
+
+    # bulk_create bypasses the signals that maintain the summary columns
+    if events:
+        Event.objects.filter(pk__range=(events[0].pk, events[-1].pk)).rebuild_summary()
+
+    return SeedResult(
+        users=len(users),
+        sessions=len(anonymous_ids),
+        events=len(events),
+        participants=len(participants),
+        expenses=expenses_total,
+    )
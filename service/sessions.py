@@ -0,0 +1,35 @@
+import secrets
+
+from django.contrib.sessions.backends.signed_cookies import SessionStore as SignedCookieSessionStore
+from django.http import HttpRequest
+
+ANONYMOUS_ID_SESSION_KEY = '_anonymous_id'
+
+
+def get_anonymous_id(request: HttpRequest, create: bool = False) -> str | None:
+    # Anonymous events are owned by an id stored inside the session rather than by the session key:
+    # the signed-cookie backend derives its key from the cookie contents, which change on every write.
+    # Server-side sessions created before the id existed fall back to their key, which their events were saved with.
+    session = request.session
+    anonymous_id = session.get(ANONYMOUS_ID_SESSION_KEY)
+
+    if anonymous_id is None and not isinstance(session, SignedCookieSessionStore):
+        anonymous_id = session.session_key
+
+    if anonymous_id is None and create:
+        anonymous_id = secrets.token_urlsafe(24)
+
+    if create and session.get(ANONYMOUS_ID_SESSION_KEY) != anonymous_id:
+        session[ANONYMOUS_ID_SESSION_KEY] = anonymous_id
+
+    return anonymous_id
+
+
+async def aget_anonymous_id(request: HttpRequest) -> str | None:
+    session = request.session
+    anonymous_id = await session.aget(ANONYMOUS_ID_SESSION_KEY)
+
+    if anonymous_id is None and not isinstance(session, SignedCookieSessionStore):
+        anonymous_id = session.session_key
+
+    return anonymous_id
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from django.core.cache import caches
+
+from .metrics import CACHE_REQUESTS, record_settlement
+from .models import Event, EventSettlement
+
+SETTLEMENT_CACHE_ALIAS = 'settlements'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def get_cache_key(event_id: int, version: int) -> str:
+    return f'settlements:{event_id}:{version}'
+
+
+def get_event_settlements(event: Event) -> list[dict]:
+    cache = caches[SETTLEMENT_CACHE_ALIAS]
+    key = get_cache_key(event.pk, event.version)
+
+    settlements = cache.get(key)
+
+    if settlements is not None:
+        _record('hits')
+        return settlements
+
+    _record('misses')
+    settlements = _get_persisted_settlements(event)
+
+    if settlements is None:
+        started_at = time.perf_counter()
+        settlements = event.calculate_participants_debt()
+        record_settlement(event, time.perf_counter() - started_at)
+
+    cache.set(key, settlements)
+
+    return settlements
+
+
+async def aget_event_settlements(event: Event) -> list[dict]:
+    cache = caches[SETTLEMENT_CACHE_ALIAS]
+    key = get_cache_key(event.pk, event.version)
+
+    settlements = await cache.aget(key)
+
+    if settlements is not None:
+        _record('hits')
+        return settlements
+
+    _record('misses')
+    settlements = _get_persisted_settlements(event)
+
+    if settlements is None:
+        started_at = time.perf_counter()
+        settlements = await event.acalculate_participants_debt()
+        record_settlement(event, time.perf_counter() - started_at)
+
+    await cache.aset(key, settlements)
+
+    return settlements
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def _get_persisted_settlements(event: Event) -> list[dict] | None:
+    # Only consult rows written by recompute_settlements when the caller already joined them in.
+    if not Event.settlement.is_cached(event):
+        return None
+
+    try:
+        persisted = event.settlement
+    except EventSettlement.DoesNotExist:
+        return None
+
+    if persisted.version != event.version:
+        return None
+
+    return persisted.get_settlements()
+
+
+def _record(outcome: str):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+    CACHE_REQUESTS.inc((SETTLEMENT_CACHE_ALIAS, outcome))
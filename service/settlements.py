@@ -0,0 +1,83 @@
+import heapq
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Hashable, Mapping, NamedTuple, Sequence
+
+MINOR_UNITS = 100
+
+
+class Transfer(NamedTuple):
+    debtor: Hashable
+    creditor: Hashable
+    amount: int
+
+
+def to_minor_units(amount: Decimal | int) -> int:
+    return int((Decimal(amount) * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(amount: int) -> Decimal:
+    return (Decimal(amount) / MINOR_UNITS).quantize(Decimal('0.01'))
+
+
+def split_balances(paid: Mapping[Hashable, int], participants: Sequence[Hashable]) -> dict[Hashable, int]:
+    if not participants:
+        return {}
+
+    total = sum(paid.get(participant, 0) for participant in participants)
+    share, remainder = divmod(total, len(participants))
+
+    # The cents that do not split evenly go to the first participants in the given order,
+    # so every call with the same input produces the same balances and they always sum to zero.
+    return {
+        participant: paid.get(participant, 0) - share - (1 if index < remainder else 0)
+        for index, participant in enumerate(participants)
+    }
+
+
+def settle(balances: Mapping[Hashable, int]) -> list[Transfer]:
+    keys = list(balances)
+    creditors = [(-balance, index) for index, balance in enumerate(balances.values()) if balance > 0]
+    debtors = [(balance, index) for index, balance in enumerate(balances.values()) if balance < 0]
+
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+
+        amount = min(-credit, -debt)
+        transfers.append(Transfer(keys[debtor], keys[creditor], amount))
+
+        if credit + amount:
+            heapq.heappush(creditors, (credit + amount, creditor))
+        if debt + amount:
+            heapq.heappush(debtors, (debt + amount, debtor))
+
+    return transfers
+
+
+def calculate_settlements(participants: Sequence[tuple[int, str]], paid: Mapping[int, Decimal]) -> list[dict]:
+    names = dict(participants)
+    balances = split_balances(
+        {participant: to_minor_units(amount) for participant, amount in paid.items()},
+        [participant for participant, _ in participants],
+    )
+
+    return [
+        {'from': names[transfer.debtor], 'to': names[transfer.creditor], 'amount': from_minor_units(transfer.amount)}
+        for transfer in settle(balances)
+    ]
+
+
+def settle_event(task: tuple) -> list[dict]:
+    # The process pool worker of recompute_settlements. It lives here because this module imports
+    # no models: under the spawn and forkserver start methods a child imports it before Django is set up.
+    participants, paid = task
+
+    if not paid:
+        return []
+
+    return calculate_settlements(participants, paid)
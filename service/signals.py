@@ -0,0 +1,84 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Event, Expense, Participant
+from .search import get_search_backend
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_expense(sender, instance: Expense, **kwargs):
+    instance._previous_summary = None
+
+    if instance.pk and not instance._state.adding:
+        # Expense.save runs in a transaction: the row stays locked until the deltas are applied, so two
+        # concurrent edits cannot both compute their delta from the same previous amount
+        instance._previous_summary = (
+            Expense.objects
+                .select_for_update()
+                .filter(pk=instance.pk)
+                .values_list('event_id', 'amount')
+                .first()
+        )
+
+
+@receiver(post_save, sender=Expense)
+def update_summary_on_expense_save(sender, instance: Expense, created: bool, **kwargs):
+    previous = getattr(instance, '_previous_summary', None)
+
+    if created or previous is None:
+        Event.objects.filter(pk=instance.event_id).apply_expense_delta(instance.amount, 1)
+        return
+
+    previous_event_id, previous_amount = previous
+
+    if previous_event_id != instance.event_id:
+        Event.objects.filter(pk=previous_event_id).apply_expense_delta(-previous_amount, -1)
+        Event.objects.filter(pk=instance.event_id).apply_expense_delta(instance.amount, 1)
+    else:
+        # a zero delta still bumps the version, so renames and payer changes invalidate cached pages
+        Event.objects.filter(pk=instance.event_id).apply_expense_delta(instance.amount - previous_amount, 0)
+
+
+@receiver(post_delete, sender=Expense)
+def update_summary_on_expense_delete(sender, instance: Expense, **kwargs):
+    Event.objects.filter(pk=instance.event_id).apply_expense_delta(-instance.amount, -1)
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def update_summary_on_participants_change(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_event_ids = list(instance.events.values_list('pk', flat=True))
+        return
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        event_ids = [instance.pk]
+    elif action == 'post_clear':
+        event_ids = getattr(instance, '_cleared_event_ids', [])
+    else:
+        event_ids = pk_set or []
+
+    Event.objects.filter(pk__in=event_ids).refresh_participants_count()
+
+
+@receiver(pre_delete, sender=Participant)
+def remember_participant_events(sender, instance: Participant, **kwargs):
+    # deleting a participant removes its through rows without m2m_changed, from the admin, the shell or a cascade
+    instance._deleted_event_ids = list(instance.events.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Participant)
+def update_summary_on_participant_delete(sender, instance: Participant, **kwargs):
+    Event.objects.filter(pk__in=getattr(instance, '_deleted_event_ids', [])).refresh_participants_count()
+
+
+@receiver(post_save, sender=Event)
+def index_event_name(sender, instance: Event, using: str, **kwargs):
+    get_search_backend(using).index_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def remove_event_name(sender, instance: Event, using: str, **kwargs):
+    get_search_backend(using).remove_event(instance.pk)
@@ -0,0 +1,173 @@
+import functools
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+
+MAX_LOGGED_PARAMS_LENGTH = 2000
+# Queries on these hold session keys, password hashes, API token hashes and emails: neither their
+# parameters nor their plans, which print the compared values, are ever written to the log.
+SENSITIVE_TABLES = ('django_session', 'service_user', 'service_apitoken', 'auth_')
+REDACTED = '<redacted>'
+
+# the request being served, so a slow query can be traced back to its view
+current_request = ContextVar('current_request', default=None)
+# set while the plan of a slow query is fetched, that query must not be logged in turn
+_explaining = ContextVar('explaining', default=False)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.slow_query, default=str)
+
+
+def get_slow_query_log_path() -> Path:
+    # One file per process: RotatingFileHandler rotates by renaming, which breaks when
+    # several gunicorn workers write and rotate the same file.
+    path = Path(settings.SLOW_QUERY_LOG_FILE)
+
+    return path.with_name(f'{path.stem}-{os.getpid()}{path.suffix}')
+
+
+@functools.cache
+def get_slow_query_logger() -> logging.Logger:
+    path = get_slow_query_log_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+        encoding='utf-8',
+    )
+    handler.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger(__name__)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    # one JSON document per line: other handlers must not get the records
+    logger.propagate = False
+
+    return logger
+
+
+if hasattr(os, 'register_at_fork'):
+    # a forked worker opens its own file rather than writing to its parent's
+    os.register_at_fork(after_in_child=get_slow_query_logger.cache_clear)
+
+
+def is_select(sql: str) -> bool:
+    return sql.lstrip().lstrip('(').upper().startswith(('SELECT', 'WITH'))
+
+
+def explain(connection, sql: str, params) -> str:
+    if connection.vendor == 'postgresql':
+        # ANALYZE runs the query a second time, so only reads are ever analyzed
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS)' if settings.SLOW_QUERY_EXPLAIN_ANALYZE else 'EXPLAIN'
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN'
+    else:
+        prefix = 'EXPLAIN'
+
+    token = _explaining.set(True)
+
+    try:
+        # a savepoint inside a transaction, so a failing EXPLAIN cannot abort the caller's transaction
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f'{prefix} {sql}', params)
+                rows = cursor.fetchall()
+    finally:
+        _explaining.reset(token)
+
+    return '\n'.join(' '.join(str(column) for column in row) for row in rows)
+
+
+def get_request_details() -> dict:
+    request = current_request.get()
+
+    if request is None:
+        return {'view': None, 'method': None, 'path': None}
+
+    return {
+        'view': request.resolver_match.view_name if request.resolver_match else None,
+        'method': request.method,
+        'path': request.path,
+    }
+
+
+def is_sensitive(sql: str) -> bool:
+    sql = sql.lower()
+
+    return any(table in sql for table in SENSITIVE_TABLES)
+
+
+def format_params(sql: str, params) -> str | None:
+    if not settings.SLOW_QUERY_LOG_PARAMS:
+        return None
+
+    if is_sensitive(sql):
+        return REDACTED
+
+    return repr(params)[:MAX_LOGGED_PARAMS_LENGTH]
+
+
+def log_slow_query(connection, sql: str, params, many: bool, duration: float):
+    sensitive = is_sensitive(sql)
+    record = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration * 1000, 3),
+        'database': connection.alias,
+        **get_request_details(),
+        'sql': sql,
+        'params': format_params(sql, params),
+        'many': many,
+        'plan': None,
+    }
+
+    if sensitive:
+        record['plan'] = REDACTED
+    elif not many and is_select(sql):
+        try:
+            record['plan'] = explain(connection, sql, params)
+        except DatabaseError as error:
+            record['plan_error'] = str(error)
+
+    get_slow_query_logger().info('slow query', extra={'slow_query': record})
+
+
+class SlowQueryWrapper:
+    # Installed on every connection: times each query and logs the ones over SLOW_QUERY_THRESHOLD_MS.
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+
+        if threshold is None or _explaining.get():
+            return execute(sql, params, many, context)
+
+        started_at = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started_at
+
+        if duration * 1000 >= threshold:
+            log_slow_query(self.connection, sql, params, many, duration)
+
+        return result
+
+
+@receiver(connection_created)
+def install_slow_query_wrapper(sender, connection, **kwargs):
+    # connection_created fires on every reconnect of the same wrapper, install only once
+    if not any(isinstance(wrapper, SlowQueryWrapper) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.insert(0, SlowQueryWrapper(connection))
@@ -5,6 +5,8 @@ register = template.Library()
 @register.simple_tag()
 def query_transform(request, **kwargs):
     query = request.GET.copy()
+    # offset page numbers are replaced by keyset cursors
+    query.pop('page', None)
 
     for key, value in kwargs.items():
         if value is not None:
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from django.urls import include, path
+
+from service.urls import get_urlpatterns
+
+# butter_split.urls with settings.ASYNC_VIEWS turned on
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include((get_urlpatterns(use_async=True), 'service'), namespace='service')),
+]
@@ -0,0 +1,11 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # primary keys are reused between tests, so version-keyed entries would leak across them
+    for cache in caches.all():
+        cache.clear()
+
+    yield
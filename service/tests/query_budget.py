@@ -0,0 +1,23 @@
+from django.core.cache import caches
+from django.db import connection
+from django.conf import settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from service.query_budget import get_query_budget
+
+
+def assert_within_query_budget(client, url_name: str, data: dict | None = None, **kwargs):
+    # cold caches: the budget has to hold for the first visitor too
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse(url_name, kwargs=kwargs or None), data)
+
+    assert response.status_code == 200
+
+    budget = get_query_budget(url_name)
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+
+    assert len(context) <= budget, f'{url_name} ran {len(context)} queries, over its budget of {budget}:\n{queries}'
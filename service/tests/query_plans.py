@@ -0,0 +1,55 @@
+import re
+from typing import Callable
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LARGE_TABLES = ('service_event', 'service_expense', 'service_participant', 'service_event_participants')
+
+SEQUENTIAL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?"?(\w+)"?'),
+    'postgresql': re.compile(r'Seq Scan on "?(\w+)"?'),
+}
+
+
+def explain(sql: str) -> str:
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # with sequential scans priced out, one only shows up when no index can serve the query
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+def capture_query_plans(request: Callable) -> list[tuple[str, str]]:
+    with CaptureQueriesContext(connection) as context:
+        request()
+
+    return [
+        (query['sql'], explain(query['sql']))
+        for query in context.captured_queries
+        if query['sql'].lstrip().upper().startswith('SELECT')
+    ]
+
+
+def find_sequential_scans(plans: list[tuple[str, str]], tables: tuple[str, ...] = LARGE_TABLES) -> list[str]:
+    pattern = SEQUENTIAL_SCAN_PATTERNS[connection.vendor]
+
+    return [
+        f'{sql}\n{plan}'
+        for sql, plan in plans
+        if any(table in tables for table in pattern.findall(plan))
+    ]
+
+
+def assert_no_sequential_scans(request: Callable, tables: tuple[str, ...] = LARGE_TABLES) -> list[tuple[str, str]]:
+    plans = capture_query_plans(request)
+    scans = find_sequential_scans(plans, tables)
+
+    assert plans, 'No queries were captured.'
+    assert not scans, 'Sequential scan on a large table:\n\n' + '\n\n'.join(scans)
+
+    return plans
@@ -0,0 +1,77 @@
+import pytest
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from service.models import Event, Expense, Participant
+from service.pagination import EstimatedCountPaginator
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture()
+def create_events(db, get_currency):
+    def index(count: int) -> list[Event]:
+        events = []
+
+        for i in range(count):
+            event = Event.objects.create(name=f'Dinner {i}', currency=get_currency)
+            participants = Participant.objects.bulk_create([Participant(name=f'Participant {i}-{j}') for j in range(3)])
+            event.participants.set(participants)
+            Expense.objects.create(name='dinner', amount=Decimal('10.00'), event=event, payer=participants[0])
+            events.append(event)
+
+        return events
+
+    return index
+
+
+def count_changelist_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+
+    assert response.status_code == 200
+
+    return len(context)
+
+
+@pytest.mark.django_db
+class TestAdminChangelists:
+    @pytest.mark.parametrize('model_name', ['event', 'expense', 'participant'])
+    def test_changelist_queries_should_not_grow_with_rows(self, admin_client, create_events, model_name):
+        url = reverse(f'admin:service_{model_name}_changelist')
+        create_events(2)
+        queries = count_changelist_queries(admin_client, url)
+
+        create_events(10)
+
+        assert count_changelist_queries(admin_client, url) == queries
+
+    def test_participants_should_show_their_event_count(self, admin_client, create_events):
+        event = create_events(1)[0]
+        shared = event.participants.first()
+        Event.objects.create(name='Lunch', currency=event.currency).participants.add(shared)
+
+        response = admin_client.get(reverse('admin:service_participant_changelist'))
+        counts = {participant.pk: participant.events_count for participant in response.context['cl'].result_list}
+
+        assert counts[shared.pk] == 2
+        assert sorted(counts.values()) == [1, 1, 2]
+
+    def test_event_search_should_use_the_search_backend(self, admin_client, create_events):
+        create_events(3)
+
+        response = admin_client.get(reverse('admin:service_event_changelist'), {'q': 'dinn'})
+
+        assert response.context['cl'].result_count == 3
+        assert not response.context['cl'].full_result_count
+
+    def test_estimated_count_should_fall_back_to_exact_count(self, create_events):
+        create_events(3)
+
+        paginator = EstimatedCountPaginator(Event.objects.order_by('pk'), 100)
+
+        assert paginator.estimate_count() is None
+        assert paginator.count == 3
+        assert EstimatedCountPaginator(Event.objects.filter(name='Dinner 1').order_by('pk'), 100).count == 1
@@ -0,0 +1,203 @@
+import json
+import pytest
+from decimal import Decimal
+from io import StringIO
+from typing import Callable
+
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse_lazy
+
+from service.api import API_EXPENSES_PER_PAGE
+from service.models import ApiToken, Event, Expense, Participant, User
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2']
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None, name: str = 'Test event') -> Event:
+        event = Event.objects.create(name=name, currency=get_currency, owner=owner)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant, creator=owner)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+@pytest.fixture()
+def user(django_user_model) -> User:
+    return django_user_model.objects.create_user(username='test-user', password='test-user-password')
+
+
+@pytest.mark.django_db
+class TestEventApi:
+    def test_event_list_should_return_sparse_fields(self, client, user, create_event):
+        event = create_event(user)
+        create_event(name='Foreign event')
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:api-event-list'), {'fields': 'id,name,currency_code'})
+
+        assert response.json() == {
+            'results': [{'id': event.pk, 'name': 'Test event', 'currency_code': 'USD'}],
+            'next_cursor': None,
+            'previous_cursor': None,
+        }
+
+    def test_unknown_fields_should_be_rejected(self, client, db):
+        response = client.get(reverse_lazy('service:api-event-list'), {'fields': 'id,password'})
+
+        assert response.status_code == 400
+        assert response.json() == {'error': 'Unknown fields: password.'}
+
+    def test_event_detail_should_include_participants(self, client, create_event, django_assert_num_queries):
+        event = create_event()
+        url = reverse_lazy('service:api-event-detail', kwargs={'pk': event.pk})
+
+        response = client.get(url, {'fields': 'name,participants_count,participants'})
+
+        assert response.json() == {
+            'name': 'Test event',
+            'participants_count': 2,
+            'participants': [
+                {'id': participant.pk, 'name': participant.name}
+                for participant in event.participants.order_by('pk')
+            ],
+        }
+
+        # conditional GET lookup, the event row, the participants
+        with django_assert_num_queries(3):
+            client.get(url)
+
+        response = client.get(url, headers={'if-none-match': response.headers['ETag']})
+
+        assert response.status_code == 304
+
+    def test_missing_event_should_return_json_404(self, client, db):
+        response = client.get(reverse_lazy('service:api-event-detail', kwargs={'pk': 404}))
+
+        assert response.status_code == 404
+        assert response.json() == {'error': 'Event not found.'}
+
+    def test_expenses_should_be_paginated_by_cursor(self, client, create_event):
+        event = create_event()
+        payer = event.participants.first()
+        Expense.objects.bulk_create([
+            Expense(name=f'expense-{i}', amount=1, event=event, payer=payer)
+            for i in range(API_EXPENSES_PER_PAGE + 3)
+        ])
+        url = reverse_lazy('service:api-event-expenses', kwargs={'pk': event.pk})
+
+        first_page = client.get(url, {'fields': 'name,amount,payer_name'}).json()
+        second_page = client.get(url, {'fields': 'name', 'cursor': first_page['next_cursor']}).json()
+
+        assert len(first_page['results']) == API_EXPENSES_PER_PAGE
+        assert first_page['results'][0] == {'name': f'expense-{API_EXPENSES_PER_PAGE + 2}', 'amount': '1.00', 'payer_name': payer.name}
+        assert second_page['results'] == [{'name': 'expense-2'}, {'name': 'expense-1'}, {'name': 'expense-0'}]
+        assert second_page['next_cursor'] is None
+
+    def test_expense_should_be_created_by_manager(self, client, user, create_event):
+        event = create_event(user)
+        payer = event.participants.first()
+        client.force_login(user)
+
+        response = client.post(
+            reverse_lazy('service:api-event-expenses', kwargs={'pk': event.pk}),
+            data=json.dumps({'name': 'dinner', 'amount': '12.50', 'payer': payer.name}),
+            content_type='application/json',
+        )
+
+        assert response.status_code == 201
+        assert response.json()['payer_id'] == payer.pk
+        assert response.json()['amount'] == '12.50'
+
+        event.refresh_from_db()
+
+        assert event.expenses_count == 1
+        assert event.total_expenses_amount == Decimal('12.50')
+
+    def test_expense_creation_should_require_manager(self, client, user, create_event):
+        event = create_event(user)
+
+        response = client.post(
+            reverse_lazy('service:api-event-expenses', kwargs={'pk': event.pk}),
+            data=json.dumps({'name': 'dinner', 'amount': '12.50', 'payer': RAW_PARTICIPANTS[0]}),
+            content_type='application/json',
+        )
+
+        assert response.status_code == 403
+        assert not Expense.objects.exists()
+
+    def test_invalid_expense_should_return_errors(self, client, user, create_event):
+        event = create_event(user)
+        client.force_login(user)
+
+        response = client.post(
+            reverse_lazy('service:api-event-expenses', kwargs={'pk': event.pk}),
+            data=json.dumps({'name': 'dinner', 'amount': '0', 'payer': 'Nobody'}),
+            content_type='application/json',
+        )
+
+        assert response.status_code == 400
+        assert response.json() == {'error': 'Amount must be > 0.'}
+
+    def test_expense_should_be_created_with_a_token_and_no_csrf(self, user, create_event):
+        event = create_event(user)
+        _, key = ApiToken.create_token(user, 'integration')
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.post(
+            reverse_lazy('service:api-event-expenses', kwargs={'pk': event.pk}),
+            data=json.dumps({'name': 'dinner', 'amount': '12.50', 'payer': RAW_PARTICIPANTS[0]}),
+            content_type='application/json',
+            headers={'Authorization': f'Token {key}'},
+        )
+
+        assert response.status_code == 201
+        assert Expense.objects.filter(event=event).count() == 1
+
+    def test_invalid_token_should_be_rejected(self, user, create_event):
+        response = Client().get(reverse_lazy('service:api-event-list'), headers={'Authorization': 'Token wrong'})
+
+        assert response.status_code == 401
+        assert response['WWW-Authenticate'] == 'Token'
+
+    def test_session_posts_should_still_need_csrf(self, user, create_event):
+        event = create_event(user)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(user)
+
+        response = client.post(
+            reverse_lazy('service:api-event-expenses', kwargs={'pk': event.pk}),
+            data=json.dumps({'name': 'dinner', 'amount': '12.50', 'payer': RAW_PARTICIPANTS[0]}),
+            content_type='application/json',
+        )
+
+        assert response.status_code == 403
+        assert response.json()['error'].startswith('CSRF check failed')
+        assert not Expense.objects.exists()
+
+    def test_command_should_print_a_working_key(self, user):
+        output = StringIO()
+
+        call_command('create_api_token', user.username, '--name', 'integration', stdout=output)
+
+        assert ApiToken.get_user(output.getvalue().splitlines()[-1]) == user
+
+    def test_settlements_should_match_the_html_page(self, client, create_event):
+        event = create_event()
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=event.participants.first())
+
+        response = client.get(reverse_lazy('service:api-event-settlements', kwargs={'pk': event.pk}))
+
+        assert response.json()['settlements'] == [
+            {'from': settlement['from'], 'to': settlement['to'], 'amount': str(settlement['amount'])}
+            for settlement in event.calculate_participants_debt()
+        ]
@@ -0,0 +1,100 @@
+import functools
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from multiprocessing import get_context
+from typing import Callable
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.urls import reverse_lazy
+from django.utils import timezone
+
+from service.management.commands import recompute_settlements
+from service.models import Event, EventSettlement, Expense, Participant
+from service.settlement_cache import SETTLEMENT_CACHE_ALIAS
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(name: str = 'Test event', amount: Decimal = Decimal('30.00')) -> Event:
+        event = Event.objects.create(name=name, currency=get_currency)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=f'{name} participant-{i}')
+            for i in range(3)
+        ])
+        event.participants.set(participants)
+        Expense.objects.create(name='dinner', amount=amount, event=event, payer=participants[0])
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+class TestRecomputeSettlementsCommand:
+    def test_settlements_should_be_persisted(self, create_event):
+        events = [create_event(name=f'event-{i}') for i in range(5)]
+        out = StringIO()
+
+        call_command('recompute_settlements', workers=0, batch_size=2, stdout=out)
+
+        assert EventSettlement.objects.count() == 5
+        assert 'events/sec' in out.getvalue()
+
+        for event in events:
+            event.refresh_from_db()
+
+            assert event.settlement.version == event.version
+            assert event.settlement.get_settlements() == event.calculate_participants_debt()
+
+    def test_settlements_should_be_computed_in_worker_processes(self, create_event):
+        event = create_event()
+
+        call_command('recompute_settlements', workers=2, stdout=StringIO())
+
+        assert EventSettlement.objects.get(event=event).get_settlements() == event.calculate_participants_debt()
+
+    def test_workers_should_start_with_spawn(self, monkeypatch, create_event):
+        # spawn children import the worker before Django is set up, as on macOS, Windows and forkserver
+        event = create_event()
+        monkeypatch.setattr(
+            recompute_settlements,
+            'ProcessPoolExecutor',
+            functools.partial(ProcessPoolExecutor, mp_context=get_context('spawn')),
+        )
+
+        call_command('recompute_settlements', workers=1, stdout=StringIO())
+
+        assert EventSettlement.objects.get(event=event).get_settlements() == event.calculate_participants_debt()
+
+    def test_since_should_skip_unchanged_events(self, create_event):
+        old_event = create_event(name='old-event')
+        Event.objects.filter(pk=old_event.pk).update(updated_at=timezone.now() - timedelta(days=2))
+        new_event = create_event(name='new-event')
+
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        call_command('recompute_settlements', workers=0, since=since, stdout=StringIO())
+
+        assert list(EventSettlement.objects.values_list('event', flat=True)) == [new_event.pk]
+
+    def test_calculate_view_should_use_persisted_settlements(self, client, create_event):
+        event = create_event()
+        call_command('recompute_settlements', workers=0, stdout=StringIO())
+
+        EventSettlement.objects.filter(pk=event.pk).update(
+            settlements=[{'from': 'persisted-debtor', 'to': 'persisted-creditor', 'amount': '1.00'}],
+        )
+        caches[SETTLEMENT_CACHE_ALIAS].clear()
+
+        response = client.get(reverse_lazy('service:event-calculate', kwargs={'pk': event.pk}))
+
+        assert response.context['settlements'] == [
+            {'from': 'persisted-debtor', 'to': 'persisted-creditor', 'amount': Decimal('1.00')},
+        ]
+
+        caches[SETTLEMENT_CACHE_ALIAS].clear()
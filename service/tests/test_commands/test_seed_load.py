@@ -0,0 +1,62 @@
+import pytest
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db.models import Count
+
+from service.benchmarking import run_size
+from service.models import Event, Expense, User
+from service.search import get_search_backend
+from service.seeding import SeedConfig
+
+
+@pytest.mark.django_db
+class TestSeedLoadCommand:
+    def test_seed_should_create_requested_rows(self):
+        out = StringIO()
+
+        call_command('seed_load', users=3, sessions=4, events=30, participants=4, expenses=10, seed=1, stdout=out)
+
+        assert User.objects.count() == 3
+        assert Session.objects.count() == 4
+        assert Event.objects.count() == 30
+        assert 'Created 3 users, 4 sessions, 30 events' in out.getvalue()
+
+    def test_seeded_summaries_should_match_rows(self):
+        call_command('seed_load', users=2, sessions=2, events=20, seed=2, stdout=StringIO())
+
+        events = Event.objects.annotate(expense_rows=Count('expenses', distinct=True), participant_rows=Count('participants', distinct=True))
+
+        for event in events:
+            assert event.expenses_count == event.expense_rows
+            assert event.participants_count == event.participant_rows
+
+        assert all(expense.payer in expense.event.participants.all() for expense in Expense.objects.select_related('event')[:50])
+
+    def test_seeded_events_should_be_searchable(self):
+        call_command('seed_load', users=1, sessions=0, events=3, seed=3, stdout=StringIO())
+
+        assert get_search_backend().filter(Event.objects.all(), 'event').count() == 3
+
+    def test_benchmarks_should_report_every_operation(self):
+        report = run_size(SeedConfig(users=2, sessions=2, events=10, participants=3, expenses=5), repeat=1)
+
+        assert report['seeded']['events'] == 10
+        assert set(report['results']) == {
+            'calculate_participants_debt',
+            'event_form_save',
+            'event_list_queryset',
+            'event_detail_queryset',
+            'event_calculate_queryset',
+            'event_list_render',
+            'event_detail_render',
+            'event_calculate_render',
+            'event_list_api',
+            'event_detail_api',
+            'event_expenses_api',
+            'event_settlements_api',
+        }
+        assert all(result['median_ms'] > 0 for result in report['results'].values())
+        assert report['results']['event_list_api']['bytes'] < report['results']['event_list_render']['bytes']
+        assert not Event.objects.exists()
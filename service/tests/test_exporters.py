@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+import pytest
+from decimal import Decimal
+from typing import Callable
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+from service.exporters import EXPENSE_EXPORT_FIELDS, SETTLEMENT_EXPORT_FIELDS
+from service.models import Event, Expense, Participant, User
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2', 'Participant-3']
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None, expenses: int = 3) -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency, owner=owner)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant, creator=owner)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        for i in range(expenses):
+            Expense.objects.create(name=f'expense-{i}', amount=Decimal('10.00'), event=event, payer=participants[0])
+
+        return event
+
+    return index
+
+
+@pytest.fixture()
+def user(django_user_model) -> User:
+    return django_user_model.objects.create_user(username='test-user', password='test-user-password')
+
+
+def read_csv_sections(content: str) -> tuple[list, list]:
+    expenses, settlements = content.split('\r\n\r\n')
+
+    return list(csv.reader(io.StringIO(expenses))), list(csv.reader(io.StringIO(settlements)))
+
+
+@pytest.mark.django_db
+class TestEventExport:
+    def test_csv_export_should_stream_expenses_and_settlements(self, client, user, create_event):
+        event = create_event(user)
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:event-export', kwargs={'pk': event.pk, 'export_format': 'csv'}))
+        expenses, settlements = read_csv_sections(b''.join(response.streaming_content).decode())
+
+        assert response.streaming
+        assert response['Content-Disposition'] == f'attachment; filename="event-{event.pk}-expenses.csv"'
+        assert expenses[0] == list(EXPENSE_EXPORT_FIELDS)
+        assert [row[2] for row in expenses[1:]] == ['expense-0', 'expense-1', 'expense-2']
+        assert settlements[0] == list(SETTLEMENT_EXPORT_FIELDS)
+        assert settlements[1:] == [
+            [settlement['from'], settlement['to'], str(settlement['amount'])]
+            for settlement in event.calculate_participants_debt()
+        ]
+
+    def test_csv_export_should_neutralize_formulas(self, client, user, create_event):
+        event = create_event(user, expenses=0)
+        payer = event.participants.order_by('pk').first()
+        Participant.objects.filter(pk=payer.pk).update(name='@SUM(A1)')
+        Expense.objects.create(name='=HYPERLINK("http://example.com")', amount=Decimal('10.00'), event=event, payer=payer)
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:event-export', kwargs={'pk': event.pk, 'export_format': 'csv'}))
+        expenses, settlements = read_csv_sections(b''.join(response.streaming_content).decode())
+
+        assert expenses[1][2:4] == ["'=HYPERLINK(\"http://example.com\")", "'@SUM(A1)"]
+        assert settlements[1:]
+        assert all(row[1] == "'@SUM(A1)" for row in settlements[1:])
+
+    def test_json_export_should_be_a_single_document(self, client, user, create_event):
+        event = create_event(user)
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:event-export', kwargs={'pk': event.pk, 'export_format': 'json'}))
+        document = json.loads(b''.join(response.streaming_content))
+
+        assert document['event'] == {'id': event.pk, 'name': 'Test event', 'currency_code': 'USD'}
+        assert [expense['name'] for expense in document['expenses']] == ['expense-0', 'expense-1', 'expense-2']
+        assert document['settlements'] == json.loads(json.dumps(event.calculate_participants_debt(), default=str))
+
+    def test_first_chunk_should_be_sent_before_querying_expenses(self, client, user, create_event):
+        event = create_event(user)
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:event-export', kwargs={'pk': event.pk, 'export_format': 'csv'}))
+        chunks = iter(response.streaming_content)
+
+        with CaptureQueriesContext(connection) as context:
+            next(chunks)
+
+        assert len(context) == 0
+
+    def test_export_should_require_manager(self, client, user, create_event):
+        event = create_event(user)
+
+        response = client.get(reverse_lazy('service:event-export', kwargs={'pk': event.pk, 'export_format': 'csv'}))
+
+        assert response.status_code == 403
+
+    def test_command_should_write_export_file(self, create_event, tmp_path):
+        event = create_event(expenses=5)
+        output = tmp_path / 'export.csv'
+
+        call_command('export_expenses', event.pk, output=output, chunk_size=2, stderr=io.StringIO())
+        expenses, settlements = read_csv_sections(output.read_bytes().decode())
+
+        assert len(expenses) == 6
+        assert len(settlements) == 3
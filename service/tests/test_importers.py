@@ -0,0 +1,120 @@
+import io
+import pytest
+from decimal import Decimal
+from typing import Callable
+
+from django.core.management import CommandError, call_command
+
+from service import importers
+from service.importers import ImportRowError, import_expenses, iter_csv_rows, iter_json_rows
+from service.models import Event, Expense, Participant
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2']
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index() -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+class TestRowReaders:
+    def test_csv_rows_should_carry_line_numbers(self):
+        stream = io.StringIO('name,payer,amount\ndinner,Participant-1,10\ntaxi,Participant-2,5\n')
+
+        assert list(iter_csv_rows(stream)) == [
+            (2, {'name': 'dinner', 'payer': 'Participant-1', 'amount': '10'}),
+            (3, {'name': 'taxi', 'payer': 'Participant-2', 'amount': '5'}),
+        ]
+
+    @pytest.mark.parametrize(
+        'content',
+        [
+            '[\n{"name": "dinner"},\n{"name": "taxi"}\n]',
+            '{"name": "dinner"}\n{"name": "taxi"}\n',
+        ],
+        ids=['json-array', 'json-lines'],
+    )
+    def test_json_rows_should_carry_line_numbers(self, content):
+        assert list(iter_json_rows(io.StringIO(content))) == [
+            (2 if content.startswith('[') else 1, {'name': 'dinner'}),
+            (3 if content.startswith('[') else 2, {'name': 'taxi'}),
+        ]
+
+    def test_json_rows_should_be_read_in_chunks(self, monkeypatch):
+        monkeypatch.setattr(importers, 'JSON_READ_SIZE', 8)
+        rows = [{'name': f'expense-{i}', 'amount': '1.00'} for i in range(50)]
+        content = '[' + ',\n'.join(f'{{"name": "{row["name"]}", "amount": "{row["amount"]}"}}' for row in rows) + ']'
+
+        assert [row for _, row in iter_json_rows(io.StringIO(content))] == rows
+
+
+@pytest.mark.django_db
+class TestImportExpenses:
+    def test_valid_rows_should_be_imported_in_batches(self, create_event, django_assert_max_num_queries):
+        event = create_event()
+        payer_id = event.participants.get(name=RAW_PARTICIPANTS[1]).pk
+        rows = [
+            (line, {'name': f'expense-{line}', 'payer': RAW_PARTICIPANTS[0] if line % 2 else payer_id, 'amount': '2.50'})
+            for line in range(1, 101)
+        ]
+
+        with django_assert_max_num_queries(10):
+            result = import_expenses(event, iter(rows), batch_size=30)
+
+        event.refresh_from_db()
+
+        assert result.imported == 100
+        assert result.error_count == 0
+        assert Expense.objects.filter(event=event).count() == 100
+        assert event.expenses_count == 100
+        assert event.total_expenses_amount == Decimal('250.00')
+
+    def test_invalid_rows_should_be_reported_with_line_numbers(self, create_event):
+        event = create_event()
+        rows = [
+            (2, {'name': 'dinner', 'payer': RAW_PARTICIPANTS[0], 'amount': '10'}),
+            (3, {'name': 'taxi', 'payer': 'stranger', 'amount': '10'}),
+            (4, {'name': 'bar', 'payer': RAW_PARTICIPANTS[0], 'amount': '-1'}),
+            (5, {'name': '', 'payer': RAW_PARTICIPANTS[0], 'amount': '1'}),
+        ]
+
+        result = import_expenses(event, iter(rows))
+
+        assert result.imported == 1
+        assert result.error_count == 3
+        assert [error.line for error in result.errors] == [3, 4, 5]
+        assert result.errors[0] == ImportRowError(3, 'Payer "stranger" is not a participant of the event Test event.')
+
+    def test_command_should_import_csv_file(self, create_event, tmp_path):
+        event = create_event()
+        path = tmp_path / 'expenses.csv'
+        path.write_text('name,payer,amount\ndinner,Participant-1,10\ntaxi,nobody,5\n')
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_expenses', event.pk, str(path), stdout=out, stderr=err)
+
+        assert Expense.objects.filter(event=event).count() == 1
+        assert 'Imported 1 expenses' in out.getvalue()
+        assert 'line 3:' in err.getvalue()
+
+    def test_command_should_reject_undecodable_file(self, create_event, tmp_path):
+        event = create_event()
+        path = tmp_path / 'expenses.csv'
+        path.write_bytes('name,payer,amount\ndîner,Participant-1,10\n'.encode('latin-1'))
+
+        with pytest.raises(CommandError, match='File could not be imported'):
+            call_command('import_expenses', event.pk, str(path), stdout=io.StringIO())
+
+        assert not Expense.objects.filter(event=event).exists()
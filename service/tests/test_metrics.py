@@ -0,0 +1,111 @@
+import os
+import pytest
+from decimal import Decimal
+from io import StringIO
+from typing import Callable
+
+from django.core.management import call_command
+from django.urls import reverse_lazy
+
+from service.metrics import METRICS_FILE_PREFIX, REQUESTS, registry
+from service.models import Event, Expense, Participant
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index() -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency)
+
+        participants = Participant.objects.bulk_create([Participant(name=f'Participant-{i}') for i in range(3)])
+        event.participants.set(participants)
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=participants[0])
+
+        return event
+
+    return index
+
+
+def scrape(client, **kwargs) -> list[str]:
+    response = client.get(reverse_lazy('service:metrics'), **kwargs)
+
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+
+    return response.content.decode().splitlines()
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_requests_should_be_counted_per_url_name(self, client, admin_client):
+        client.get(reverse_lazy('service:event-list'))
+        client.get(reverse_lazy('service:event-list'))
+        client.get('/no-such-page')
+
+        lines = scrape(admin_client)
+
+        assert 'butter_split_requests_total{view="service:event-list",method="GET",status="200"} 2' in lines
+        assert 'butter_split_requests_total{view="unresolved",method="GET",status="404"} 1' in lines
+        assert 'butter_split_request_duration_seconds_count{view="service:event-list"} 2' in lines
+        assert 'butter_split_request_duration_seconds_bucket{view="service:event-list",le="+Inf"} 2' in lines
+        assert any(line.startswith('butter_split_request_queries_bucket{view="service:event-list",le="3"} 2') for line in lines)
+        assert '# TYPE butter_split_request_duration_seconds histogram' in lines
+
+    def test_settlements_should_record_cache_results_and_sizes(self, client, admin_client, create_event):
+        event = create_event()
+        url = reverse_lazy('service:event-calculate', kwargs={'pk': event.pk})
+
+        client.get(url)
+        client.get(url)
+
+        lines = scrape(admin_client)
+
+        assert 'butter_split_cache_requests_total{cache="settlements",result="misses"} 1' in lines
+        assert 'butter_split_cache_requests_total{cache="settlements",result="hits"} 1' in lines
+        assert 'butter_split_settlement_seconds_count 1' in lines
+        assert 'butter_split_settled_event_participants_bucket{le="3"} 1' in lines
+        assert 'butter_split_settled_event_expenses_bucket{le="2"} 1' in lines
+
+    def test_worker_files_should_be_summed(self, admin_client, settings, tmp_path):
+        settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+        labels = ('service:index', 'GET', '200')
+
+        # values flushed by a worker that has since exited
+        REQUESTS.inc(labels, 3)
+        registry.flush()
+        os.replace(tmp_path / f'{METRICS_FILE_PREFIX}{os.getpid()}.json', tmp_path / f'{METRICS_FILE_PREFIX}0.json')
+        registry.reset()
+
+        REQUESTS.inc(labels, 2)
+
+        assert registry.collect()['butter_split_requests'][labels] == 5
+        assert 'butter_split_requests_total{view="service:index",method="GET",status="200"} 5' in scrape(admin_client)
+
+    def test_metrics_should_be_closed_by_default(self, client):
+        assert client.get(reverse_lazy('service:metrics')).status_code == 403
+
+    def test_token_should_open_metrics(self, client, settings):
+        settings.METRICS_TOKEN = 'scrape-token'
+
+        assert client.get(reverse_lazy('service:metrics'), headers={'Authorization': 'Bearer wrong'}).status_code == 403
+        assert scrape(client, headers={'Authorization': 'Bearer scrape-token'})
+
+    def test_allowed_address_should_open_metrics(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ['127.0.0.1']
+
+        assert scrape(client)
+
+    def test_overhead_should_be_measured(self):
+        out = StringIO()
+
+        call_command('benchmark_metrics', iterations=100, stdout=out)
+
+        assert 'us/request' in out.getvalue()
+        assert not REQUESTS.values
@@ -0,0 +1,157 @@
+import pytest
+from decimal import Decimal
+from io import StringIO
+from typing import Callable
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from service.models import Event, Expense, Participant, User
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None) -> Event:
+        event = Event.objects.create(name='test-event', owner=owner, currency=get_currency)
+        participants = Participant.objects.bulk_create([
+            Participant(name=name, creator=owner)
+            for name in ('Participant-1', 'Participant-2')
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+class TestEventSummary:
+    def test_summary_should_follow_participants(self, create_event):
+        event = create_event()
+        event.refresh_from_db()
+
+        assert event.participants_count == 2
+
+        event.participants.remove(event.participants.first())
+        event.refresh_from_db()
+
+        assert event.participants_count == 1
+
+    def test_summary_should_follow_expenses(self, create_event):
+        event = create_event()
+        payer = event.participants.first()
+
+        expense = Expense.objects.create(name='dinner', amount=Decimal('10.50'), event=event, payer=payer)
+        Expense.objects.create(name='taxi', amount=Decimal('4.50'), event=event, payer=payer)
+        event.refresh_from_db()
+
+        assert event.expenses_count == 2
+        assert event.total_expenses_amount == Decimal('15.00')
+
+        expense.amount = Decimal('20.50')
+        expense.save()
+        event.refresh_from_db()
+
+        assert event.expenses_count == 2
+        assert event.total_expenses_amount == Decimal('25.00')
+
+        expense.delete()
+        event.refresh_from_db()
+
+        assert event.expenses_count == 1
+        assert event.total_expenses_amount == Decimal('4.50')
+
+    def test_summary_should_follow_edits_of_stale_instances(self, create_event):
+        event = create_event()
+        expense = Expense.objects.create(name='dinner', amount=Decimal('10.00'), event=event, payer=event.participants.first())
+        first, second = Expense.objects.get(pk=expense.pk), Expense.objects.get(pk=expense.pk)
+
+        first.amount = Decimal('20.00')
+        first.save()
+
+        with CaptureQueriesContext(connection) as context:
+            second.amount = Decimal('30.00')
+            second.save()
+
+        event.refresh_from_db()
+
+        assert event.total_expenses_amount == Decimal('30.00')
+
+        if connection.features.has_select_for_update:
+            assert any('FOR UPDATE' in query['sql'] for query in context.captured_queries)
+
+    def test_summary_should_follow_cascade_deletion(self, create_event):
+        event = create_event()
+        payer = event.participants.first()
+
+        Expense.objects.create(name='dinner', amount=Decimal('10.00'), event=event, payer=payer)
+        payer.delete()
+        event.refresh_from_db()
+
+        assert event.expenses_count == 0
+        assert event.total_expenses_amount == 0
+        assert event.participants_count == 1
+
+    def test_summary_should_follow_participants_deleted_with_their_creator(self, django_user_model, create_event):
+        owner = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        event = create_event()
+        event.participants.add(Participant.objects.create(name='Participant-3', creator=owner))
+        event.refresh_from_db()
+
+        assert event.participants_count == 3
+
+        owner.delete()
+        event.refresh_from_db()
+
+        assert event.participants_count == 2
+
+    def test_save_should_not_overwrite_summary(self, create_event):
+        event = create_event()
+        event.participants.remove(event.participants.first())
+
+        event.name = 'renamed-event'
+        event.save()
+        event.refresh_from_db()
+
+        assert event.participants_count == 1
+
+    def test_with_summary_should_annotate_live_aggregates(self, create_event):
+        event = create_event()
+        payer = event.participants.first()
+
+        for amount in ('10.00', '2.50', '7.50'):
+            Expense.objects.create(name='expense', amount=Decimal(amount), event=event, payer=payer)
+
+        annotated = Event.objects.with_summary().get(pk=event.pk)
+
+        assert annotated.participant_count == 2
+        assert annotated.expense_count == 3
+        assert annotated.total_amount == Decimal('20.00')
+
+    def test_rebuild_command_should_repair_summary(self, create_event):
+        event = create_event()
+        Expense.objects.create(name='dinner', amount=Decimal('10.00'), event=event, payer=event.participants.first())
+        Event.objects.filter(pk=event.pk).update(total_expenses_amount=0, expenses_count=0, participants_count=0)
+
+        call_command('rebuild_event_summaries')
+        event.refresh_from_db()
+
+        assert event.participants_count == 2
+        assert event.expenses_count == 1
+        assert event.total_expenses_amount == Decimal('10.00')
+
+    def test_rebuild_command_should_only_report_with_check(self, create_event):
+        event = create_event()
+        stale = Event.objects.create(name='stale-event', currency=event.currency)
+        Event.objects.filter(pk=stale.pk).update(expenses_count=3)
+        output = StringIO()
+
+        call_command('rebuild_event_summaries', '--check', stdout=output)
+        stale.refresh_from_db()
+
+        assert f'Event {stale.pk}: participants 0 != 0, expenses 3 != 0' in output.getvalue()
+        assert f'Event {event.pk}:' not in output.getvalue()
+        assert '1 events have an out of date summary.' in output.getvalue()
+        assert stale.expenses_count == 3
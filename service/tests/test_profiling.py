@@ -0,0 +1,129 @@
+import pstats
+import pytest
+import time
+from io import StringIO
+from typing import Callable
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.urls import reverse_lazy
+
+from service.models import Event, Participant
+from service.profiling import PROFILE_HEADER, StackSampler, choose_profiler
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index() -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency)
+        event.participants.set(Participant.objects.bulk_create([Participant(name=f'Participant-{i}') for i in range(2)]))
+
+        return event
+
+    return index
+
+
+@pytest.fixture()
+def profiling_dir(settings, tmp_path):
+    settings.PROFILING_DIR = str(tmp_path)
+
+    return tmp_path
+
+
+def busy(seconds: float):
+    finish_at = time.perf_counter() + seconds
+
+    while time.perf_counter() < finish_at:
+        pass
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    def test_staff_should_get_a_cprofile_dump(self, admin_client, create_event, profiling_dir):
+        event = create_event()
+
+        response = admin_client.get(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}), headers={PROFILE_HEADER: 'cprofile'})
+
+        profile = profiling_dir / response[PROFILE_HEADER]
+
+        assert profile.name.endswith('.prof')
+        assert '-service-event-detail-' in profile.name
+        assert any(function == 'get_context_data' for _, _, function in pstats.Stats(str(profile)).stats)
+
+    def test_query_parameter_should_choose_the_sampler(self, admin_client, create_event, profiling_dir):
+        event = create_event()
+
+        response = admin_client.get(reverse_lazy('service:event-calculate', kwargs={'pk': event.pk}), {'profile': 'sample'})
+
+        assert response[PROFILE_HEADER].endswith('.collapsed')
+        assert (profiling_dir / response[PROFILE_HEADER]).is_file()
+
+    def test_other_users_should_not_be_profiled_on_request(self, client, create_event, profiling_dir):
+        response = client.get(reverse_lazy('service:event-list'), headers={PROFILE_HEADER: 'cprofile'})
+
+        assert PROFILE_HEADER not in response
+        assert not list(profiling_dir.iterdir())
+
+    def test_sampled_requests_should_be_profiled_quietly(self, client, settings, profiling_dir):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+
+        response = client.get(reverse_lazy('service:event-list'))
+
+        assert PROFILE_HEADER not in response
+        assert [path.suffix for path in profiling_dir.iterdir()] == ['.collapsed']
+
+    def test_sampling_should_not_load_the_user(self, rf, settings, profiling_dir):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        request = rf.get(reverse_lazy('service:event-list'))
+
+        assert choose_profiler(request) == ('sample', False)
+        assert not hasattr(request, 'user')
+
+    def test_sync_views_should_be_profiled_under_asgi(self, async_client, admin_user, create_event, profiling_dir):
+        event = create_event()
+        async_client.force_login(admin_user)
+
+        response = async_to_sync(async_client.get)(
+            reverse_lazy('service:event-detail', kwargs={'pk': event.pk}),
+            headers={PROFILE_HEADER: 'cprofile'},
+        )
+        profile = profiling_dir / response[PROFILE_HEADER]
+
+        assert response.status_code == 200
+        assert any(function == 'get_context_data' for _, _, function in pstats.Stats(str(profile)).stats)
+
+    def test_profiling_should_be_off_without_a_directory(self, admin_client, settings):
+        settings.PROFILING_DIR = None
+
+        response = admin_client.get(reverse_lazy('service:event-list'), headers={PROFILE_HEADER: 'cprofile'})
+
+        assert PROFILE_HEADER not in response
+
+
+class TestStackSampler:
+    def test_samples_should_be_written_as_collapsed_stacks(self, tmp_path):
+        sampler = StackSampler()
+        sampler.start()
+        busy(0.05)
+        sampler.stop()
+
+        sampler.write(tmp_path / 'busy.collapsed')
+        lines = (tmp_path / 'busy.collapsed').read_text().splitlines()
+
+        assert any('busy (test_profiling.py:' in line for line in lines)
+        assert all(line.rpartition(' ')[2].isdigit() for line in lines)
+
+    def test_command_should_combine_collapsed_stacks(self, tmp_path):
+        (tmp_path / 'a.collapsed').write_text('main;view 3\nmain;render 1\n')
+        (tmp_path / 'b.collapsed').write_text('main;view 2\n')
+
+        call_command(
+            'combine_profiles',
+            tmp_path / 'a.collapsed',
+            tmp_path / 'b.collapsed',
+            output=tmp_path / 'all.collapsed',
+            stdout=StringIO(),
+        )
+
+        assert (tmp_path / 'all.collapsed').read_text() == 'main;view 5\nmain;render 1\n'
@@ -0,0 +1,62 @@
+import logging
+import pytest
+import random
+
+from asgiref.sync import async_to_sync
+from django.urls import reverse_lazy
+
+from service.models import Event
+from service.seeding import SeedConfig, seed
+from service.tests.query_budget import assert_within_query_budget
+
+DATA_SIZES = [
+    SeedConfig(users=2, sessions=2, events=10, participants=3, expenses=5),
+    SeedConfig(users=3, sessions=3, events=60, participants=8, expenses=40),
+]
+
+
+@pytest.fixture()
+def largest_event(db, client) -> Event:
+    def index(config: SeedConfig) -> Event:
+        seed(config, random.Random(0))
+        event = Event.objects.filter(owner__isnull=False).order_by('-expenses_count', 'pk').first()
+        client.force_login(event.owner)
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    @pytest.mark.parametrize('config', DATA_SIZES)
+    def test_hot_pages_should_stay_within_budget(self, client, largest_event, config):
+        event = largest_event(config)
+
+        assert_within_query_budget(client, 'service:index')
+        assert_within_query_budget(client, 'service:event-list')
+        assert_within_query_budget(client, 'service:event-list', {'name': 'event'})
+        assert_within_query_budget(client, 'service:event-detail', pk=event.pk)
+        assert_within_query_budget(client, 'service:event-calculate', pk=event.pk)
+
+    def test_request_over_budget_should_be_logged(self, client, settings, caplog, largest_event):
+        event = largest_event(DATA_SIZES[0])
+        settings.QUERY_BUDGETS = {'service:event-detail': 1}
+
+        with caplog.at_level(logging.WARNING, logger='service.query_budget'):
+            client.get(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}))
+            client.get(reverse_lazy('service:event-calculate', kwargs={'pk': event.pk}))
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].getMessage().startswith('Query budget exceeded by service:event-detail:')
+        assert 'for a budget of 1,' in caplog.records[0].getMessage()
+
+    @pytest.mark.urls('service.tests.async_urls')
+    def test_async_views_should_be_counted(self, async_client, settings, caplog, largest_event):
+        largest_event(DATA_SIZES[0])
+        settings.QUERY_BUDGETS = {'service:event-list': 0}
+
+        with caplog.at_level(logging.WARNING, logger='service.query_budget'):
+            async_to_sync(async_client.get)(reverse_lazy('service:event-list'))
+
+        assert 'service:event-list' in caplog.records[0].getMessage()
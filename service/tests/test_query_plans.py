@@ -0,0 +1,102 @@
+import pytest
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.urls import reverse_lazy
+
+from service.models import Event, Expense, Participant
+from service.settlement_cache import SETTLEMENT_CACHE_ALIAS
+from service.tests.fixtures import get_currency
+from service.tests.query_plans import assert_no_sequential_scans
+
+EVENTS_PER_OWNER = 15
+PARTICIPANTS_PER_EVENT = 5
+EXPENSES_PER_EVENT = 30
+
+
+@pytest.fixture()
+def seeded_db(db, django_user_model, get_currency, client):
+    users = [
+        django_user_model.objects.create_user(username=f'user-{i}', password='user-password')
+        for i in range(3)
+    ]
+
+    session = client.session
+    session.save()
+    owners = [(user, None) for user in users] + [(None, session.session_key), (None, 'other-session')]
+
+    for owner, session_key in owners:
+        for i in range(EVENTS_PER_OWNER):
+            event = Event.objects.create(
+                name=f'event-{i}',
+                currency=get_currency,
+                owner=owner,
+                session_id=session_key,
+            )
+            participants = Participant.objects.bulk_create([
+                Participant(name=f'participant-{j}', creator=owner)
+                for j in range(PARTICIPANTS_PER_EVENT)
+            ])
+            event.participants.set(participants)
+            Expense.objects.bulk_create([
+                Expense(name=f'expense-{j}', amount=Decimal('1.50'), event=event, payer=participants[j % PARTICIPANTS_PER_EVENT])
+                for j in range(EXPENSES_PER_EVENT)
+            ])
+
+    # bulk_create sends no signals, the summary columns the pages read are filled in here
+    Event.objects.all().rebuild_summary()
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+    return users[0], session.session_key
+
+
+@pytest.mark.django_db
+class TestHotQueryPlans:
+    def test_index_should_not_scan_tables(self, client, seeded_db):
+        user, _ = seeded_db
+
+        assert_no_sequential_scans(lambda: client.get(reverse_lazy('service:index')))
+
+        client.force_login(user)
+        assert_no_sequential_scans(lambda: client.get(reverse_lazy('service:index')))
+
+    def test_event_list_should_not_scan_tables(self, client, seeded_db):
+        user, _ = seeded_db
+        url = reverse_lazy('service:event-list')
+
+        assert_no_sequential_scans(lambda: client.get(url))
+
+        client.force_login(user)
+        cursor = client.get(url).context['page_obj'].next_cursor
+        assert_no_sequential_scans(lambda: client.get(url, {'cursor': cursor}))
+
+    def test_event_detail_should_not_scan_tables(self, client, seeded_db):
+        user, _ = seeded_db
+        client.force_login(user)
+        event = Event.objects.filter(owner=user).first()
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+
+        assert event.expenses_count == EXPENSES_PER_EVENT
+
+        cursor = client.get(url).context['expense_page'].next_cursor
+        plans = assert_no_sequential_scans(lambda: client.get(url, {'cursor': cursor}))
+
+        # the keyset query of the expense list, which only runs when the list is rendered
+        assert any('FROM "service_expense"' in sql for sql, _ in plans)
+
+    def test_event_calculate_should_not_scan_tables(self, client, seeded_db):
+        user, _ = seeded_db
+        event = Event.objects.filter(owner=user).first()
+
+        assert_no_sequential_scans(
+            lambda: client.get(reverse_lazy('service:event-calculate', kwargs={'pk': event.pk}))
+        )
+
+        caches[SETTLEMENT_CACHE_ALIAS].clear()
@@ -0,0 +1,119 @@
+import pytest
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.template import engines
+from django.template.response import TemplateResponse
+from django.test import RequestFactory
+from django.urls import reverse_lazy
+
+from service.middleware import PrimaryStickinessMiddleware
+from service.models import Event, Participant
+from service.routers import PRIMARY_STICKY_COOKIE, ReplicaRouter, replica_reads
+from service.tests.fixtures import get_currency
+
+router = ReplicaRouter()
+
+
+@pytest.fixture()
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.REPLICA_STICKY_SECONDS = 5
+
+
+def read_alias_view(request):
+    return HttpResponse(router.db_for_read(Event) or 'default')
+
+
+@pytest.mark.usefixtures('replicas')
+class TestReplicaRouter:
+    def test_replica_reads_should_route_reads_to_a_replica(self, rf: RequestFactory):
+        view = replica_reads(read_alias_view)
+
+        assert view(rf.get('/')).content == b'replica'
+        assert router.db_for_read(Event) is None
+        assert router.db_for_write(Event) == 'default'
+
+    def test_unsafe_requests_and_sticky_clients_should_read_from_primary(self, rf: RequestFactory):
+        view = replica_reads(read_alias_view)
+
+        assert view(rf.post('/')).content == b'default'
+
+        request = rf.get('/')
+        request.COOKIES[PRIMARY_STICKY_COOKIE] = '1'
+
+        assert view(request).content == b'default'
+
+    def test_sessions_should_always_be_read_from_primary(self, rf: RequestFactory):
+        view = replica_reads(lambda request: HttpResponse(router.db_for_read(Session)))
+
+        assert view(rf.get('/')).content == b'default'
+
+    def test_reads_after_a_write_should_stay_on_primary(self, rf: RequestFactory):
+        def view(request):
+            before = router.db_for_read(Event)
+            router.db_for_write(Event)
+
+            return HttpResponse(f'{before} {router.db_for_read(Event)}')
+
+        assert replica_reads(view)(rf.get('/')).content == b'replica None'
+
+    def test_template_responses_should_render_on_the_replica(self, rf: RequestFactory):
+        template = engines['django'].from_string('{{ alias }}')
+
+        def view(request):
+            return TemplateResponse(request, template, {'alias': lambda: router.db_for_read(Event)})
+
+        assert replica_reads(view)(rf.get('/')).content == b'replica'
+
+    def test_replicas_should_not_be_migrated(self):
+        assert router.allow_migrate('replica', 'service') is False
+        assert router.allow_migrate('default', 'service') is None
+
+    def test_relations_across_primary_and_replica_should_be_allowed(self):
+        event = Event(name='event')
+        participant = Participant(name='participant')
+        event._state.db = 'replica'
+        participant._state.db = 'default'
+
+        assert router.allow_relation(event, participant)
+
+        participant._state.db = 'other'
+
+        assert router.allow_relation(event, participant) is None
+
+
+@pytest.mark.usefixtures('replicas')
+class TestPrimaryStickinessMiddleware:
+    def test_writes_should_pin_the_client_to_primary(self, rf: RequestFactory):
+        def view(request):
+            router.db_for_write(Event)
+            return HttpResponse()
+
+        response = PrimaryStickinessMiddleware(view)(rf.post('/'))
+
+        assert response.cookies[PRIMARY_STICKY_COOKIE]['max-age'] == 5
+
+    def test_session_writes_should_not_pin_the_client(self, rf: RequestFactory):
+        def view(request):
+            router.db_for_write(Session)
+            return HttpResponse()
+
+        response = PrimaryStickinessMiddleware(view)(rf.post('/'))
+
+        assert PRIMARY_STICKY_COOKIE not in response.cookies
+
+    @pytest.mark.django_db
+    def test_adding_an_expense_should_pin_the_client(self, client, get_currency):
+        session = client.session
+        session.save()
+        event = Event.objects.create(name='event', currency=get_currency, session_id=session.session_key)
+        event.participants.add(Participant.objects.create(name='participant'))
+
+        response = client.post(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}), data={
+            'name': 'dinner',
+            'amount': 10,
+            'payer': event.participants.get().pk,
+        })
+
+        assert PRIMARY_STICKY_COOKIE in response.cookies
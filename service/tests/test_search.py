@@ -0,0 +1,98 @@
+import pytest
+from typing import Callable
+
+from django.urls import reverse_lazy
+
+from service.models import Event, User
+from service.search import SqliteFTS5SearchBackend, get_search_backend
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(name: str, owner: User = None) -> Event:
+        return Event.objects.create(name=name, currency=get_currency, owner=owner)
+
+    return index
+
+
+@pytest.mark.django_db
+class TestSqliteFTS5SearchBackend:
+    def test_sqlite_should_use_fts5_backend(self):
+        assert isinstance(get_search_backend(), SqliteFTS5SearchBackend)
+
+    def test_search_should_match_word_prefixes(self, create_event):
+        dinner = create_event('Dinner in Berlin')
+        create_event('Trip to Paris')
+
+        found = get_search_backend().filter(Event.objects.all(), 'din ber')
+
+        assert list(found) == [dinner]
+
+    def test_search_should_still_match_inside_words(self, create_event):
+        dinner = create_event('Dinner in Berlin')
+        create_event('Trip to Paris')
+
+        found = get_search_backend().filter(Event.objects.all(), 'nner')
+
+        assert list(found) == [dinner]
+
+    def test_ranked_search_should_put_substring_matches_last(self, create_event):
+        inside = create_event('Stripes')
+        word = create_event('Trip')
+
+        ranked = get_search_backend().ranked(Event.objects.all(), 'trip')
+
+        assert list(ranked) == [word, inside]
+
+    def test_index_should_follow_renames_and_deletions(self, create_event):
+        event = create_event('Dinner in Berlin')
+        backend = get_search_backend()
+
+        event.name = 'Lunch in Rome'
+        event.save()
+
+        assert not backend.filter(Event.objects.all(), 'dinner').exists()
+        assert list(backend.filter(Event.objects.all(), 'rome')) == [event]
+
+        event.delete()
+
+        assert not backend.filter(Event.objects.all(), 'rome').exists()
+
+    def test_ranked_search_should_order_by_relevance(self, create_event):
+        weak = create_event('Party with a long name about many other things and a trip')
+        strong = create_event('Trip')
+
+        ranked = get_search_backend().ranked(Event.objects.all(), 'trip')
+
+        assert list(ranked) == [strong, weak]
+
+
+@pytest.mark.django_db
+class TestEventListSearch:
+    def test_event_list_should_be_filtered_by_search(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+
+        create_event('Dinner in Berlin', owner=user)
+        create_event('Trip to Paris', owner=user)
+
+        response = client.get(reverse_lazy('service:event-list'), {'name': 'berl'})
+
+        assert 'Dinner in Berlin' in response.content.decode()
+        assert 'Trip to Paris' not in response.content.decode()
+
+    def test_search_results_should_be_paged_by_relevance(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+
+        weak = [create_event(f'Stripes {i}', owner=user) for i in range(3)]
+        strong = [create_event(f'Trip {i}', owner=user) for i in range(3)]
+        url = reverse_lazy('service:event-list')
+
+        first = client.get(url, {'name': 'trip'}).context['page_obj']
+        second = client.get(url, {'name': 'trip', 'cursor': first.next_cursor}).context['page_obj']
+
+        assert list(first) == strong[::-1] + weak[2:]
+        assert list(second) == weak[1::-1]
+        assert not second.has_next()
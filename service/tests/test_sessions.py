@@ -0,0 +1,106 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse_lazy
+from django.utils import timezone
+
+from service.models import Event
+from service.sessions import ANONYMOUS_ID_SESSION_KEY
+from service.tests.fixtures import get_currency
+
+SESSION_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+
+
+@pytest.mark.django_db
+class TestAnonymousSessions:
+    @pytest.mark.parametrize('engine', SESSION_ENGINES)
+    def test_anonymous_event_should_stay_owned_across_requests(self, client, get_currency, engine):
+        with override_settings(SESSION_ENGINE=engine):
+            client.post(reverse_lazy('service:event-create'), data={
+                'name': 'Anonymous event',
+                'currency': get_currency.pk,
+                'participants': ['Participant-1'],
+            })
+            event = Event.objects.get(name='Anonymous event')
+
+            assert event.owner is None
+            assert event.session_id
+
+            # adding an expense rewrites a signed cookie, the owner id has to survive it
+            client.post(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}), data={
+                'name': 'dinner',
+                'amount': 10,
+                'payer': event.participants.get().pk,
+            })
+            response = client.get(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}))
+
+            assert response.context['can_manage']
+            assert event.expenses.count() == 1
+
+            response = client.get(reverse_lazy('service:event-list'))
+
+            assert list(response.context['event_list']) == [event]
+
+    def test_legacy_session_should_keep_its_events(self, client, get_currency):
+        session = client.session
+        session.save()
+        event = Event.objects.create(name='Legacy event', currency=get_currency, session_id=session.session_key)
+
+        response = client.get(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}))
+
+        assert response.context['can_manage']
+        assert ANONYMOUS_ID_SESSION_KEY not in client.session
+
+    def test_other_sessions_should_not_manage_the_event(self, client, get_currency):
+        event = Event.objects.create(name='Foreign event', currency=get_currency, session_id='other-session')
+
+        response = client.get(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}))
+
+        assert not response.context['can_manage']
+
+
+@pytest.mark.django_db
+class TestPurgeSessionsCommand:
+    def test_expired_sessions_should_be_purged_in_batches(self):
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(session_key=f'expired-{i}', session_data='', expire_date=now - timedelta(days=1))
+            for i in range(5)
+        ] + [
+            Session(session_key='active', session_data='', expire_date=now + timedelta(days=1)),
+        ])
+        out = StringIO()
+
+        call_command('purge_sessions', batch_size=2, stdout=out)
+
+        assert list(Session.objects.values_list('session_key', flat=True)) == ['active']
+        assert 'Purged 5 expired sessions.' in out.getvalue()
+
+    def test_cookie_sessions_should_have_nothing_to_purge(self):
+        out = StringIO()
+
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            call_command('purge_sessions', stdout=out)
+
+        assert 'nothing to purge' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_benchmark_sessions_should_report_every_engine():
+    out = StringIO()
+
+    call_command('benchmark_sessions', *SESSION_ENGINES, iterations=5, stdout=out)
+
+    results = dict(line.split(': ') for line in out.getvalue().splitlines())
+
+    assert set(results) == set(SESSION_ENGINES)
+    assert results['django.contrib.sessions.backends.db'].endswith('1.00 queries/load')
+    assert results['django.contrib.sessions.backends.cached_db'].endswith('0.00 queries/load')
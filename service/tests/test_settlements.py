@@ -0,0 +1,83 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from service.settlements import (
+    Transfer,
+    calculate_settlements,
+    from_minor_units,
+    settle,
+    split_balances,
+    to_minor_units,
+)
+
+
+class TestMinorUnits:
+    @pytest.mark.parametrize(
+        'amount, minor_units',
+        [
+            (Decimal('100.49'), 10049),
+            (Decimal('0.01'), 1),
+            (Decimal('0.005'), 1),
+            (0, 0),
+        ],
+    )
+    def test_amount_should_be_converted_to_minor_units(self, amount, minor_units):
+        assert to_minor_units(amount) == minor_units
+
+    def test_minor_units_should_be_converted_back(self):
+        assert from_minor_units(10049) == Decimal('100.49')
+
+
+class TestSplitBalances:
+    def test_remainder_should_be_spread_deterministically(self):
+        balances = split_balances({'a': 100}, ['a', 'b', 'c'])
+
+        assert balances == {'a': 66, 'b': -33, 'c': -33}
+        assert sum(balances.values()) == 0
+
+    def test_balances_should_always_sum_to_zero(self):
+        participants = list(range(7))
+        paid = {participant: random.randint(0, 100_000) for participant in participants}
+
+        assert sum(split_balances(paid, participants).values()) == 0
+
+    def test_no_participants_should_give_no_balances(self):
+        assert split_balances({}, []) == {}
+
+
+class TestSettle:
+    def test_single_debt_should_be_settled(self):
+        assert settle({'a': 50, 'b': -50}) == [Transfer('b', 'a', 50)]
+
+    def test_even_balances_should_not_be_settled(self):
+        assert settle({'a': 0, 'b': 0}) == []
+
+    def test_large_event_should_settle_in_at_most_n_minus_one_transfers(self):
+        participants = list(range(10_000))
+        paid = {participant: random.randint(0, 100_000) for participant in participants}
+        balances = split_balances(paid, participants)
+
+        transfers = settle(balances)
+
+        assert len(transfers) <= len(participants) - 1
+
+        for transfer in transfers:
+            balances[transfer.debtor] += transfer.amount
+            balances[transfer.creditor] -= transfer.amount
+
+        assert not any(balances.values())
+
+
+class TestCalculateSettlements:
+    def test_settlements_should_use_participant_names(self):
+        settlements = calculate_settlements(
+            [(1, 'Alice'), (2, 'Bob'), (3, 'Carol')],
+            {1: Decimal('30.00'), 2: Decimal('0.01')},
+        )
+
+        assert settlements == [
+            {'from': 'Carol', 'to': 'Alice', 'amount': Decimal('10.00')},
+            {'from': 'Bob', 'to': 'Alice', 'amount': Decimal('9.99')},
+        ]
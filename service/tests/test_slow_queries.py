@@ -0,0 +1,108 @@
+import json
+import os
+import pytest
+from decimal import Decimal
+from typing import Callable
+
+from django.db import connection
+from django.urls import reverse_lazy
+
+from service.models import Currency, Event, Expense, Participant
+from service.slow_queries import SlowQueryWrapper, get_slow_query_log_path, get_slow_query_logger
+from service.tests.fixtures import get_currency
+
+
+@pytest.fixture()
+def slow_query_log(settings, tmp_path):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_LOG_FILE = tmp_path / 'slow_queries.log'
+    get_slow_query_logger.cache_clear()
+
+    def read() -> list[dict]:
+        for handler in get_slow_query_logger().handlers:
+            handler.flush()
+
+        return [json.loads(line) for line in get_slow_query_log_path().read_text().splitlines()]
+
+    yield read
+
+    for handler in get_slow_query_logger().handlers:
+        handler.close()
+
+    get_slow_query_logger.cache_clear()
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index() -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency)
+        participants = Participant.objects.bulk_create([Participant(name=f'Participant-{i}') for i in range(2)])
+        event.participants.set(participants)
+        Expense.objects.create(name='dinner', amount=Decimal('10.00'), event=event, payer=participants[0])
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+    def test_wrapper_should_be_installed_once_per_connection(self):
+        connection.ensure_connection()
+
+        assert len([wrapper for wrapper in connection.execute_wrappers if isinstance(wrapper, SlowQueryWrapper)]) == 1
+
+    def test_queries_should_be_logged_with_view_and_plan(self, client, create_event, slow_query_log):
+        event = create_event()
+
+        client.get(reverse_lazy('service:event-calculate', kwargs={'pk': event.pk}))
+
+        records = [record for record in slow_query_log() if record['view'] == 'service:event-calculate']
+        debt_query = next(record for record in records if 'SUM("service_expense"."amount")' in record['sql'])
+
+        assert debt_query['method'] == 'GET'
+        assert debt_query['path'] == f'/event/calculate/{event.pk}'
+        assert debt_query['duration_ms'] >= 0
+        assert 'service_expense' in debt_query['plan']
+
+    def test_writes_should_be_logged_without_plan(self, get_currency, slow_query_log):
+        Currency.objects.create(code='EUR', name='Euro', symbol='€')
+
+        insert = next(record for record in slow_query_log() if record['sql'].startswith('INSERT'))
+
+        assert insert['plan'] is None
+        assert insert['view'] is None
+
+    def test_nothing_should_be_logged_without_threshold(self, settings, create_event, slow_query_log):
+        create_event()
+        settings.SLOW_QUERY_THRESHOLD_MS = None
+
+        Event.objects.count()
+
+        assert not any('COUNT(*)' in record['sql'] for record in slow_query_log())
+
+    def test_params_should_only_be_logged_when_enabled(self, settings, get_currency, slow_query_log):
+        Currency.objects.filter(code='EUR').exists()
+        settings.SLOW_QUERY_LOG_PARAMS = True
+        Currency.objects.filter(code='GBP').exists()
+
+        records = [record for record in slow_query_log() if 'service_currency' in record['sql']]
+
+        assert records[0]['params'] is None
+        assert 'GBP' in records[1]['params']
+
+    def test_session_and_user_queries_should_be_redacted(self, settings, admin_client, slow_query_log):
+        settings.SLOW_QUERY_LOG_PARAMS = True
+
+        admin_client.get(reverse_lazy('service:event-list'))
+
+        records = [record for record in slow_query_log() if 'django_session' in record['sql'] or 'service_user' in record['sql']]
+
+        assert records
+        assert all(record['params'] == '<redacted>' and record['plan'] == '<redacted>' for record in records)
+
+    def test_each_process_should_write_its_own_file(self, settings, slow_query_log):
+        path = get_slow_query_log_path()
+
+        assert path.parent == settings.SLOW_QUERY_LOG_FILE.parent
+        assert path.name == f'slow_queries-{os.getpid()}.log'
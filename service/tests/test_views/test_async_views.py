@@ -0,0 +1,154 @@
+import pytest
+from decimal import Decimal
+from typing import Callable
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+from service.models import Event, Expense, Participant, User
+from service.settlement_cache import get_stats, reset_stats
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2']
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None, name: str = 'Test event', session_id: str = None) -> Event:
+        event = Event.objects.create(name=name, currency=get_currency, owner=owner, session_id=session_id)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant, creator=owner)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+@pytest.fixture()
+def user(django_user_model) -> User:
+    return django_user_model.objects.create_user(username='test-user', password='test-user-password')
+
+
+def get(async_client, url, **kwargs):
+    return async_to_sync(async_client.get)(url, **kwargs)
+
+
+@pytest.mark.django_db
+@pytest.mark.urls('service.tests.async_urls')
+class TestAsyncViews:
+    def test_index_should_list_event_chips(self, async_client, user, create_event):
+        create_event(user, name='Async event')
+        async_client.force_login(user)
+
+        response = get(async_client, reverse_lazy('service:index'))
+
+        assert response.status_code == 200
+        assert [event.name for event in response.context['event_chips']] == ['Async event']
+
+    def test_event_list_should_paginate_and_search(self, async_client, user, create_event):
+        for i in range(6):
+            create_event(user, name=f'Trip {i}')
+        create_event(user, name='Dinner')
+        async_client.force_login(user)
+
+        url = reverse_lazy('service:event-list')
+        response = get(async_client, url)
+
+        assert [event.name for event in response.context['event_list']] == ['Dinner', 'Trip 5', 'Trip 4', 'Trip 3']
+
+        response = get(async_client, url, data={'cursor': response.context['page_obj'].next_cursor})
+
+        assert [event.name for event in response.context['event_list']] == ['Trip 2', 'Trip 1', 'Trip 0']
+
+        response = get(async_client, url, data={'name': 'din'})
+
+        assert [event.name for event in response.context['event_list']] == ['Dinner']
+
+    def test_event_detail_should_render_for_anonymous_owner(self, async_client, create_event):
+        session = async_client.session
+        session.save()
+        event = create_event(session_id=session.session_key)
+        Expense.objects.create(name='dinner', amount=10, event=event, payer=event.participants.first())
+
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+        response = get(async_client, url)
+        content = response.content.decode()
+
+        assert response.context['can_manage']
+        assert 'dinner' in content
+        assert RAW_PARTICIPANTS[1] in content
+
+        response = get(async_client, url, headers={'if-none-match': response.headers['ETag']})
+
+        assert response.status_code == 304
+
+    def test_event_detail_should_not_load_cached_expenses(self, async_client, user, create_event):
+        event = create_event(user)
+        Expense.objects.create(name='dinner', amount=10, event=event, payer=event.participants.first())
+        async_client.force_login(user)
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+        caches['template_fragments'].clear()
+
+        get(async_client, url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = get(async_client, url)
+
+        assert 'dinner' in response.content.decode()
+        assert not [query for query in context.captured_queries if 'FROM "service_expense"' in query['sql']]
+
+    def test_event_detail_should_load_expenses_when_the_fragment_is_gone(self, async_client, user, create_event, monkeypatch):
+        event = create_event(user)
+        Expense.objects.create(name='dinner', amount=10, event=event, payer=event.participants.first())
+        async_client.force_login(user)
+        caches['template_fragments'].clear()
+
+        async def ahas_key(*args, **kwargs):
+            # the entry expires between the check and the render
+            return True
+
+        monkeypatch.setattr(type(caches['template_fragments']), 'ahas_key', ahas_key)
+
+        response = get(async_client, reverse_lazy('service:event-detail', kwargs={'pk': event.pk}))
+
+        assert 'dinner' in response.content.decode()
+
+    def test_event_detail_post_should_add_expense(self, async_client, user, create_event):
+        event = create_event(user)
+        async_client.force_login(user)
+
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+        response = async_to_sync(async_client.post)(url, data={
+            'name': 'dinner',
+            'amount': 10,
+            'payer': event.participants.first().pk,
+        })
+
+        assert response.status_code == 302
+        assert event.expenses.count() == 1
+
+    def test_event_calculate_should_compute_and_cache_settlements(self, async_client, create_event):
+        event = create_event()
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=event.participants.first())
+        reset_stats()
+
+        url = reverse_lazy('service:event-calculate', kwargs={'pk': event.pk})
+        response = get(async_client, url)
+
+        assert response.context['settlements'] == event.calculate_participants_debt()
+
+        get(async_client, url)
+
+        assert get_stats()['hits'] == 1
+
+    def test_missing_event_should_return_404(self, async_client, db):
+        response = get(async_client, reverse_lazy('service:event-detail', kwargs={'pk': 404}))
+
+        assert response.status_code == 404
@@ -0,0 +1,97 @@
+import pytest
+from decimal import Decimal
+from typing import Callable
+
+from django.urls import reverse_lazy
+
+from service.models import Event, Expense, Participant, User
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2']
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None) -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency, owner=owner)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant, creator=owner)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['service:event-detail', 'service:event-calculate'])
+class TestEventConditionalGet:
+    def test_unchanged_event_should_not_be_modified(
+            self,
+            client,
+            django_user_model,
+            create_event,
+            url_name,
+            django_assert_max_num_queries,
+    ):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+        event = create_event(owner=user)
+
+        url = reverse_lazy(url_name, kwargs={'pk': event.pk})
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+        assert 'private' in response['Cache-Control']
+
+        # session, user and the event stamp
+        with django_assert_max_num_queries(3):
+            response = client.get(url, headers={'if-none-match': response['ETag']})
+
+        assert response.status_code == 304
+
+    def test_expense_change_should_modify_event(self, client, django_user_model, create_event, url_name):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+        event = create_event(owner=user)
+
+        url = reverse_lazy(url_name, kwargs={'pk': event.pk})
+        etag = client.get(url)['ETag']
+
+        Expense.objects.create(name='dinner', amount=Decimal('10.00'), event=event, payer=event.participants.first())
+        response = client.get(url, headers={'if-none-match': etag})
+
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_event_edit_should_modify_event(self, client, django_user_model, create_event, url_name):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+        event = create_event(owner=user)
+
+        url = reverse_lazy(url_name, kwargs={'pk': event.pk})
+        etag = client.get(url)['ETag']
+
+        event.name = 'Renamed event'
+        event.save()
+
+        assert client.get(url, headers={'if-none-match': etag}).status_code == 200
+
+    def test_etag_should_differ_between_viewers(self, client, django_user_model, create_event, url_name):
+        owner = django_user_model.objects.create_user(username='owner', password='owner-password')
+        viewer = django_user_model.objects.create_user(username='viewer', password='viewer-password')
+        event = create_event(owner=owner)
+        url = reverse_lazy(url_name, kwargs={'pk': event.pk})
+
+        client.force_login(owner)
+        owner_etag = client.get(url)['ETag']
+
+        client.force_login(viewer)
+        response = client.get(url, headers={'if-none-match': owner_etag})
+
+        assert response.status_code == 200
+        assert response['ETag'] != owner_etag
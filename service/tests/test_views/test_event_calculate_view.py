@@ -0,0 +1,130 @@
+import pytest
+from decimal import Decimal
+from typing import Callable
+
+from django.core.cache import caches
+from django.urls import reverse_lazy
+
+from service.models import Event, Expense, Participant, User
+from service.settlement_cache import SETTLEMENT_CACHE_ALIAS, get_stats, reset_stats
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2']
+
+
+@pytest.fixture(autouse=True)
+def settlement_cache():
+    caches[SETTLEMENT_CACHE_ALIAS].clear()
+    reset_stats()
+
+    yield caches[SETTLEMENT_CACHE_ALIAS]
+
+    caches[SETTLEMENT_CACHE_ALIAS].clear()
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None) -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency, owner=owner)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant, creator=owner)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+class TestEventCalculateView:
+    def test_settlements_should_be_displayed(self, client, create_event):
+        event = create_event()
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=event.participants.first())
+
+        url = reverse_lazy('service:event-calculate', kwargs={'pk': event.pk})
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.context['settlements'] == [
+            {'from': RAW_PARTICIPANTS[1], 'to': RAW_PARTICIPANTS[0], 'amount': Decimal('15.00')},
+        ]
+
+    def test_repeated_views_should_hit_settlement_cache(self, client, create_event):
+        event = create_event()
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=event.participants.first())
+
+        url = reverse_lazy('service:event-calculate', kwargs={'pk': event.pk})
+        client.get(url)
+        client.get(url)
+
+        assert get_stats()['misses'] == 1
+        assert get_stats()['hits'] == 1
+
+    def test_expense_change_should_invalidate_settlement_cache(self, client, create_event):
+        event = create_event()
+        payer = event.participants.first()
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=payer)
+
+        url = reverse_lazy('service:event-calculate', kwargs={'pk': event.pk})
+        client.get(url)
+
+        Expense.objects.create(name='taxi', amount=Decimal('10.00'), event=event, payer=payer)
+        response = client.get(url)
+
+        assert get_stats()['misses'] == 2
+        assert response.context['settlements'][0]['amount'] == Decimal('20.00')
+
+    def test_calculate_page_should_fit_query_budget(self, client, create_event, django_assert_max_num_queries):
+        event = create_event()
+
+        for i in range(20):
+            payer = event.participants.all()[i % len(RAW_PARTICIPANTS)]
+            Expense.objects.create(name=f'expense-{i}', amount=Decimal('10.00'), event=event, payer=payer)
+
+        url = reverse_lazy('service:event-calculate', kwargs={'pk': event.pk})
+
+        with django_assert_max_num_queries(3):
+            client.get(url)
+
+        with django_assert_max_num_queries(1):
+            client.get(url)
+
+    def test_settlements_should_be_built_from_prefetched_rows(self, create_event, django_assert_num_queries):
+        event = create_event()
+        Expense.objects.create(name='dinner', amount=Decimal('30.00'), event=event, payer=event.participants.first())
+
+        event = Event.objects.prefetch_related('participants', 'expenses').get(pk=event.pk)
+
+        with django_assert_num_queries(0):
+            settlements = event.calculate_participants_debt()
+
+        assert settlements == [
+            {'from': RAW_PARTICIPANTS[1], 'to': RAW_PARTICIPANTS[0], 'amount': Decimal('15.00')},
+        ]
+
+
+@pytest.mark.django_db
+class TestSettlementCacheStatsView:
+    def test_stats_should_not_be_visible_for_regular_users(self, client, django_user_model):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:settlement-cache-stats'))
+
+        assert response.status_code == 302
+
+    def test_stats_should_be_visible_for_staff(self, client, django_user_model):
+        user = django_user_model.objects.create_user(
+            username='test-user',
+            password='test-user-password',
+            is_staff=True,
+        )
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:settlement-cache-stats'))
+
+        assert response.status_code == 200
+        assert response.json() == {'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
@@ -64,6 +64,33 @@ class TestPrivateEventCreateView:
         assert created_event in created_participant.events.all()
         assert created_event.session_id is None
 
+    def test_event_with_many_participants_should_be_created_in_few_queries(
+            self,
+            client,
+            django_user_model,
+            get_post_data: dict,
+            django_assert_max_num_queries,
+    ):
+        user = django_user_model.objects.create_user(
+            username='test-user',
+            password='user-password'
+        )
+
+        client.force_login(user)
+
+        post_data = get_post_data.copy()
+        post_data['participants'] = [f'Participant-{i}' for i in range(500)]
+
+        url = reverse_lazy('service:event-create')
+
+        with django_assert_max_num_queries(20):
+            client.post(url, data=post_data)
+
+        created_event = Event.objects.get(name=post_data['name'])
+
+        assert created_event.participants.count() == 500
+        assert created_event.participants_count == 500
+
 
 @pytest.mark.django_db
 class TestPublicEventCreateView:
@@ -1,8 +1,11 @@
 import pytest
 from typing import Callable
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 
-from service.models import Participant, Event, User
+from service.models import Participant, Event, Expense, User
+from service.views import EXPENSES_PER_PAGE
 from service.tests.fixtures import get_currency
 
 
@@ -44,3 +47,94 @@ class TestEventDetailView:
         assert event.name in response.content.decode()
         assert event.currency.symbol in response.content.decode()
 
+    def test_event_detail_view_should_paginate_expenses(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        event = create_event(user)
+        payer = event.participants.first()
+
+        Expense.objects.bulk_create([
+            Expense(name=f'expense-{i}', amount=1, event=event, payer=payer)
+            for i in range(EXPENSES_PER_PAGE + 5)
+        ])
+
+        client.force_login(user)
+
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+
+        response = client.get(url)
+        expense_page = response.context['expense_page']
+
+        assert len(expense_page) == EXPENSES_PER_PAGE
+        assert expense_page.has_next()
+
+        response = client.get(url, {'cursor': expense_page.next_cursor})
+
+        assert len(response.context['expense_page']) == 5
+        assert not response.context['expense_page'].has_next()
+
+    def test_event_detail_view_should_reuse_cached_expenses_until_event_changes(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        event = create_event(user)
+        payer = event.participants.first()
+        expense = Expense.objects.create(name='dinner', amount=10, event=event, payer=payer)
+
+        client.force_login(user)
+
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+
+        assert 'dinner' in response.content.decode()
+        assert not [query for query in context.captured_queries if 'FROM "service_expense"' in query['sql']]
+
+        expense.name = 'lunch'
+        expense.save()
+        Expense.objects.create(name='taxi', amount=5, event=event, payer=payer)
+
+        response = client.get(url)
+
+        assert 'lunch' in response.content.decode()
+        assert 'taxi' in response.content.decode()
+
+    def test_event_detail_view_should_not_show_cached_delete_buttons_to_visitors(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        event = create_event(user)
+        Expense.objects.create(name='dinner', amount=10, event=event, payer=event.participants.first())
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+
+        client.force_login(user)
+
+        assert 'name="Delete"' in client.get(url).content.decode()
+
+        client.logout()
+        response = client.get(url)
+
+        assert 'dinner' in response.content.decode()
+        assert 'name="Delete"' not in response.content.decode()
+
+    def test_event_detail_view_should_not_cache_query_parameters_in_pagination(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        event = create_event(user)
+        payer = event.participants.first()
+        Expense.objects.bulk_create([
+            Expense(name=f'expense-{i}', amount=1, event=event, payer=payer)
+            for i in range(EXPENSES_PER_PAGE + 1)
+        ])
+        Event.objects.filter(pk=event.pk).rebuild_summary()
+        url = reverse_lazy('service:event-detail', kwargs={'pk': event.pk})
+
+        client.get(url, {'utm_source': 'newsletter'})
+        response = client.get(url)
+
+        assert f'href="?cursor={response.context["expense_page"].next_cursor}"' in response.content.decode()
+        assert 'utm_source' not in response.content.decode()
+
+    def test_event_detail_view_should_ignore_invalid_cursors(self, client, create_event):
+        event = create_event()
+
+        response = client.get(reverse_lazy('service:event-detail', kwargs={'pk': event.pk}), {'cursor': 'not-a-cursor'})
+
+        assert response.status_code == 200
+        assert response.context['expense_cursor'] is None
@@ -0,0 +1,62 @@
+import pytest
+from typing import Callable
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse_lazy
+
+from service.models import Event, Expense, Participant, User
+from service.tests.fixtures import get_currency
+
+RAW_PARTICIPANTS = ['Participant-1', 'Participant-2']
+
+
+@pytest.fixture()
+def create_event(db, get_currency) -> Callable:
+    def index(owner: User = None) -> Event:
+        event = Event.objects.create(name='Test event', currency=get_currency, owner=owner)
+
+        participants = Participant.objects.bulk_create([
+            Participant(name=participant, creator=owner)
+            for participant in RAW_PARTICIPANTS
+        ])
+        event.participants.set(participants)
+
+        return event
+
+    return index
+
+
+@pytest.mark.django_db
+class TestEventExpenseImportView:
+    def test_expenses_should_be_imported_by_owner(self, client, django_user_model, create_event):
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+        event = create_event(owner=user)
+
+        upload = SimpleUploadedFile(
+            'expenses.json',
+            b'[{"name": "dinner", "payer": "Participant-1", "amount": "12.30"},\n'
+            b' {"name": "taxi", "payer": "Participant-3", "amount": "4"}]',
+        )
+
+        url = reverse_lazy('service:event-import', kwargs={'pk': event.pk})
+        response = client.post(url, data={'file': upload, 'format': 'json'})
+
+        assert response.status_code == 200
+        assert response.context['result'].imported == 1
+        assert 'Line 2:' in response.content.decode()
+        assert Expense.objects.filter(event=event).count() == 1
+
+    def test_import_should_be_forbidden_for_other_users(self, client, django_user_model, create_event):
+        owner = django_user_model.objects.create_user(username='owner', password='owner-password')
+        user = django_user_model.objects.create_user(username='test-user', password='test-user-password')
+        client.force_login(user)
+        event = create_event(owner=owner)
+
+        upload = SimpleUploadedFile('expenses.csv', b'name,payer,amount\ndinner,Participant-1,10\n')
+
+        url = reverse_lazy('service:event-import', kwargs={'pk': event.pk})
+        response = client.post(url, data={'file': upload, 'format': 'csv'})
+
+        assert response.status_code == 403
+        assert not Expense.objects.exists()
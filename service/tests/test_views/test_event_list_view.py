@@ -55,7 +55,7 @@ class TestPrivateEventListView:
             owner=log_user
         )
 
-        response = client.get(url + '?page=1')
+        response = client.get(url)
 
         assert "Event from log-user" in response.content.decode()
         assert "Event from test-user" not in response.content.decode()
@@ -73,11 +73,11 @@ class TestPrivateEventListView:
 
         url = reverse_lazy('service:event-list')
 
-        response = client.get(url + '?page=1')
+        response = client.get(url)
 
 
         assert response.status_code == 200
-        assert response.context['page_obj'].number == 1
+        assert not response.context['page_obj'].has_previous()
         assert len(response.context['object_list']) == EVENTS_PER_PAGE
 
         assert f"{user.username} event-10" in response.content.decode()
@@ -86,7 +86,7 @@ class TestPrivateEventListView:
         assert f"{user.username} event-7" in response.content.decode()
         assert f"{user.username} event-6" not in response.content.decode()
 
-        response = client.get(url + '?page=2')
+        response = client.get(url, {'cursor': response.context['page_obj'].next_cursor})
 
         assert f"{user.username} event-6" in response.content.decode()
         assert f"{user.username} event-5" in response.content.decode()
@@ -94,10 +94,17 @@ class TestPrivateEventListView:
         assert f"{user.username} event-3" in response.content.decode()
         assert f"{user.username} event-2" not in response.content.decode()
 
-        response = client.get(url + '?page=3')
+        response = client.get(url, {'cursor': response.context['page_obj'].next_cursor})
 
         assert f"{user.username} event-2" in response.content.decode()
         assert f"{user.username} event-1" in response.content.decode()
+        assert not response.context['page_obj'].has_next()
+
+        response = client.get(url, {'cursor': response.context['page_obj'].previous_cursor})
+
+        assert f"{user.username} event-6" in response.content.decode()
+        assert f"{user.username} event-3" in response.content.decode()
+        assert f"{user.username} event-2" not in response.content.decode()
 
 
 @pytest.mark.django_db
@@ -110,11 +117,11 @@ class TestPublicEventListView:
 
         url = reverse_lazy('service:event-list')
 
-        response = client.get(url + '?page=1')
+        response = client.get(url)
 
 
         assert response.status_code == 200
-        assert response.context['page_obj'].number == 1
+        assert not response.context['page_obj'].has_previous()
         assert len(response.context['object_list']) == EVENTS_PER_PAGE
 
         assert f"{session.session_key} event-10" in response.content.decode()
@@ -123,7 +130,7 @@ class TestPublicEventListView:
         assert f"{session.session_key} event-7" in response.content.decode()
         assert f"{session.session_key} event-6" not in response.content.decode()
 
-        response = client.get(url + '?page=2')
+        response = client.get(url, {'cursor': response.context['page_obj'].next_cursor})
 
         assert f"{session.session_key} event-6" in response.content.decode()
         assert f"{session.session_key} event-5" in response.content.decode()
@@ -131,7 +138,46 @@ class TestPublicEventListView:
         assert f"{session.session_key} event-3" in response.content.decode()
         assert f"{session.session_key} event-2" not in response.content.decode()
 
-        response = client.get(url + '?page=3')
+        response = client.get(url, {'cursor': response.context['page_obj'].next_cursor})
 
         assert f"{session.session_key} event-2" in response.content.decode()
-        assert f"{session.session_key} event-1" in response.content.decode()
\ No newline at end of file
+        assert f"{session.session_key} event-1" in response.content.decode()
+
+@pytest.mark.django_db
+class TestEventListViewPagination:
+    def test_invalid_cursor_should_fall_back_to_first_page(self, django_user_model, client, create_events):
+        user = django_user_model.objects.create(
+            username='test-user',
+            password='test-user-password'
+        )
+
+        create_events(owner=user)
+        client.force_login(user)
+
+        response = client.get(reverse_lazy('service:event-list'), {'cursor': 'not-a-cursor'})
+
+        assert response.status_code == 200
+        assert f"{user.username} event-10" in response.content.decode()
+
+    def test_deep_pages_should_cost_the_same_as_first_page(
+            self,
+            django_user_model,
+            client,
+            create_events,
+            django_assert_num_queries,
+    ):
+        user = django_user_model.objects.create(
+            username='test-user',
+            password='test-user-password'
+        )
+
+        create_events(owner=user)
+        client.force_login(user)
+
+        url = reverse_lazy('service:event-list')
+        response = client.get(url)
+        response = client.get(url, {'cursor': response.context['page_obj'].next_cursor})
+
+        # the session comes from the cache; user and a single keyset query, no COUNT(*)
+        with django_assert_num_queries(2):
+            client.get(url, {'cursor': response.context['page_obj'].next_cursor})
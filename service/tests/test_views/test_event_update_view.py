@@ -76,6 +76,35 @@ class TestPrivateEventUpdateView:
         assert event.currency == get_currency_to_update
         assert event_participants_names == update_post_data['participants']
 
+    def test_removed_participant_shared_with_other_event_should_be_kept(
+            self,
+            client,
+            django_user_model,
+            update_post_data: dict,
+            create_event: Callable,
+            get_currency: Currency,
+    ):
+        user = django_user_model.objects.create_user(
+            username="Test user",
+            password="test-user-password"
+        )
+        client.force_login(user)
+
+        event = create_event(owner=user)
+        removed_participant = event.participants.get(name='Participant-2')
+
+        other_event = Event.objects.create(name="Other event", currency=get_currency, owner=user)
+        other_event.participants.add(removed_participant)
+
+        url = reverse_lazy('service:event-update', kwargs={'pk': event.pk})
+        client.post(url, data=update_post_data)
+
+        event.refresh_from_db()
+
+        assert removed_participant not in event.participants.all()
+        assert removed_participant in other_event.participants.all()
+        assert event.participants_count == 2
+
 
 class TestPublicEventUpdateView:
     def test_event_should_be_updated_with_session_key(
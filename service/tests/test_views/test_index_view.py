@@ -75,3 +75,30 @@ class TestPrivateIndexView:
         assert 'event-2' in response.content.decode()
         assert 'event-1' not in response.content.decode()
         assert user.username in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestIndexViewQueries:
+    def test_event_chips_should_be_loaded_in_one_query(
+            self,
+            client,
+            create_events,
+            django_user_model,
+            django_assert_num_queries,
+    ):
+        user = django_user_model.objects.create_user(
+            username="test",
+            password="user-password"
+        )
+
+        client.force_login(user)
+        create_events(owner=user)
+
+        url = reverse_lazy('service:index')
+
+        # the session comes from the cache; user lookup, then the chips
+        with django_assert_num_queries(2):
+            response = client.get(url)
+
+        assert len(response.context['event_chips']) == 3
+        assert response.context['is_max_events_reached']
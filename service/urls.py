@@ -1,19 +1,46 @@
+from django.conf import settings
 from django.urls import path, include
-from debug_toolbar.toolbar import debug_toolbar_urls
-
-from .views import index, event_calculate_view, UserCreateView, UserLoginView, EventCreateView, EventListView, EventDeleteView, EventUpdateView, EventDetailView
-
-urlpatterns = [
-    path('', index, name='index'),
-    path('accounts/', include('django.contrib.auth.urls')),
-    path('accounts/registrate', UserCreateView.as_view(), name='registrate'),
-    path('accounts/login', UserLoginView.as_view(), name='login'),
-    path('event/create', EventCreateView.as_view(), name='event-create'),
-    path('event/list', EventListView.as_view(), name='event-list'),
-    path('event/delete/<int:pk>', EventDeleteView.as_view(), name='event-delete'),
-    path('event/update/<int:pk>', EventUpdateView.as_view(), name='event-update'),
-    path('event/<int:pk>', EventDetailView.as_view(), name='event-detail'),
-    path('event/calculate/<int:pk>', event_calculate_view, name='event-calculate'),
-] + debug_toolbar_urls()
+
+from . import api, async_views
+from .views import index, event_calculate_view, event_export_view, settlement_cache_stats_view, metrics_view, UserCreateView, UserLoginView, EventCreateView, EventListView, EventDeleteView, EventUpdateView, EventDetailView, EventExpenseImportView
+
+
+def get_read_urlpatterns(use_async: bool) -> list:
+    if use_async:
+        return [
+            path('', async_views.index, name='index'),
+            path('event/list', async_views.event_list_view, name='event-list'),
+            path('event/<int:pk>', async_views.event_detail_view, name='event-detail'),
+            path('event/calculate/<int:pk>', async_views.event_calculate_view, name='event-calculate'),
+        ]
+
+    return [
+        path('', index, name='index'),
+        path('event/list', EventListView.as_view(), name='event-list'),
+        path('event/<int:pk>', EventDetailView.as_view(), name='event-detail'),
+        path('event/calculate/<int:pk>', event_calculate_view, name='event-calculate'),
+    ]
+
+
+def get_urlpatterns(use_async: bool) -> list:
+    return get_read_urlpatterns(use_async) + [
+        path('accounts/', include('django.contrib.auth.urls')),
+        path('accounts/registrate', UserCreateView.as_view(), name='registrate'),
+        path('accounts/login', UserLoginView.as_view(), name='login'),
+        path('event/create', EventCreateView.as_view(), name='event-create'),
+        path('event/delete/<int:pk>', EventDeleteView.as_view(), name='event-delete'),
+        path('event/update/<int:pk>', EventUpdateView.as_view(), name='event-update'),
+        path('event/import/<int:pk>', EventExpenseImportView.as_view(), name='event-import'),
+        path('event/export/<int:pk>/<str:export_format>', event_export_view, name='event-export'),
+        path('event/calculate/cache-stats', settlement_cache_stats_view, name='settlement-cache-stats'),
+        path('metrics', metrics_view, name='metrics'),
+        path('api/v1/events', api.event_list_api, name='api-event-list'),
+        path('api/v1/events/<int:pk>', api.event_detail_api, name='api-event-detail'),
+        path('api/v1/events/<int:pk>/expenses', api.event_expenses_api, name='api-event-expenses'),
+        path('api/v1/events/<int:pk>/settlements', api.event_settlements_api, name='api-event-settlements'),
+    ]
+
+
+urlpatterns = get_urlpatterns(settings.ASYNC_VIEWS)
 
 app_name = 'service'
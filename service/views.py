@@ -1,29 +1,57 @@
+import csv
+import io
+import secrets
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.views import LoginView
-from django.core.exceptions import PermissionDenied
-from django.db.models import Prefetch
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
-from django.shortcuts import render, redirect
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse_lazy
-from django.views.generic import CreateView, ListView, DeleteView, UpdateView, DetailView
-
-from .forms import UserCreateForm, EventForm, EventListSearchForm, EventDetailForm, ExpenseForm, UserLoginForm
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.cache import cache_control
+from django.views.generic import CreateView, ListView, DeleteView, UpdateView, DetailView, FormView
+
+from .conditional import event_condition, get_request_event
+from .forms import (
+    UserCreateForm,
+    EventForm,
+    EventListSearchForm,
+    EventDetailForm,
+    ExpenseForm,
+    ExpenseImportForm,
+    UserLoginForm,
+)
+from .exporters import EXPORTERS
+from .metrics import registry as metrics_registry
+from .importers import ROW_READERS, import_expenses
 from .models import Event, Expense
+from .pagination import CursorPaginator
+from .routers import replica_reads
+from .search import get_search_backend
+from .sessions import get_anonymous_id
+from .settlement_cache import get_event_settlements, get_stats as get_settlement_cache_stats
 
 MAX_EVENT_CHIPS = 3
+EXPENSES_PER_PAGE = 20
 
+@replica_reads
 def index(request: HttpRequest) -> HttpResponse:
     if request.user.is_authenticated:
         event_chips = Event.objects.filter(owner=request.user)
     else:
-        event_chips = Event.objects.filter(owner=None, session_id=request.session.session_key)
+        event_chips = Event.objects.filter(owner=None, session_id=get_anonymous_id(request))
 
-    event_chips = event_chips.order_by('-created_at')
+    # One extra row tells whether there are more events, without a separate COUNT(*).
+    event_chips = list(event_chips.order_by('-created_at').only('id', 'name')[:MAX_EVENT_CHIPS + 1])
 
     context = {
         'event_chips': event_chips[:MAX_EVENT_CHIPS],
         'max_event_chips': MAX_EVENT_CHIPS,
-        'is_max_events_reached': event_chips.count() > MAX_EVENT_CHIPS,
+        'is_max_events_reached': len(event_chips) > MAX_EVENT_CHIPS,
     }
 
     return render(request, 'pages/index.html', context=context)
@@ -57,7 +85,7 @@ class EventCreateView(CreateView):
     def get_form_kwargs(self):
         kwargs = super(EventCreateView, self).get_form_kwargs()
         kwargs['user'] = self.request.user
-        kwargs['session_key'] = self.request.session.session_key
+        kwargs['session_key'] = get_anonymous_id(self.request)
         return kwargs
 
     def form_valid(self, form):
@@ -67,14 +95,14 @@ class EventCreateView(CreateView):
         else:
             form.instance.owner = None
 
-            if not self.request.session.session_key:
-                self.request.session.save()
-            form.instance.session_id = self.request.session.session_key
+            form.instance.session_id = get_anonymous_id(self.request, create=True)
 
+        # ModelFormMixin.form_valid would save the event (and resync participants) a second time
         self.object = form.save()
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
+@method_decorator(replica_reads, name='get')
 class EventListView(ListView):
     model = Event
     form_class = EventListSearchForm
@@ -88,26 +116,33 @@ class EventListView(ListView):
 
         return context
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        page = paginator.get_page(self.request.GET.get('cursor'))
+
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def get_queryset(self):
         form = EventListSearchForm(self.request.GET)
         queryset = Event.objects.filter(
             owner=None,
-            session_id=self.request.session.session_key
+            session_id=get_anonymous_id(self.request)
         )
 
         if self.request.user and self.request.user.is_authenticated:
             queryset = Event.objects.filter(owner=self.request.user)
 
 
+        self.cursor_ordering = ('-created_at', '-id')
+
         if form.is_valid() and form.cleaned_data.get('name'):
-            queryset = queryset.filter(name__icontains=form.cleaned_data['name'])
+            # search results come best match first
+            search_backend = get_search_backend()
+            queryset = search_backend.ranked(queryset, form.cleaned_data['name'])
+            self.cursor_ordering = search_backend.rank_ordering
 
-        return (
-            queryset
-                .order_by('-created_at')
-                .select_related('owner', 'currency')
-                .prefetch_related('participants', 'expenses')
-        )
+        # Cards read the denormalized summary columns, so no participants or expenses are loaded.
+        return queryset.select_related('currency')
 
 
 class EventDeleteView(DeleteView):
@@ -142,11 +177,14 @@ class EventUpdateView(UpdateView):
     def get_form_kwargs(self):
         kwargs = super(EventUpdateView, self).get_form_kwargs()
         kwargs['user'] = self.request.user
-        kwargs['session_key'] = self.request.session.session_key
+        kwargs['session_key'] = get_anonymous_id(self.request)
 
         return kwargs
 
 
+@method_decorator(replica_reads, name='get')
+@method_decorator(cache_control(private=True, no_cache=True), name='get')
+@method_decorator(event_condition, name='get')
 class EventDetailView(DetailView):
     model = Event
     template_name = 'pages/event_detail.html'
@@ -156,18 +194,17 @@ class EventDetailView(DetailView):
     def get_queryset(self):
         return (Event.objects
         .select_related('owner', 'currency')
-        .prefetch_related(
-            'participants',
-            Prefetch(
-                'expenses',
-                queryset=Expense.objects.select_related('payer')
-            ),
-        ))
+        .prefetch_related('participants'))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = EventDetailForm(instance=self.object)
         context['can_manage'] = self.object.is_user_can_manage(self.request)
+        paginator = CursorPaginator(Expense.objects.filter(event=self.object).select_related('payer'), EXPENSES_PER_PAGE)
+        # part of the expense list cache key: made up cursors must not each get their own entry
+        context['expense_cursor'] = paginator.clean_cursor(self.request.GET.get('cursor'))
+        # lazy, so a cached expense list fragment does not query the expenses at all
+        context['expense_page'] = SimpleLazyObject(lambda: paginator.get_page(context['expense_cursor']))
 
         if 'expense_form' in kwargs:
             context['expense_form'] = kwargs['expense_form']
@@ -200,14 +237,66 @@ class EventDetailView(DetailView):
         return self.render_to_response(context)
 
 
+class EventExpenseImportView(FormView):
+    template_name = 'pages/event-import-page.html'
+    form_class = ExpenseImportForm
+
+    def dispatch(self, request, *args, **kwargs):
+        self.event = get_object_or_404(Event.objects.select_related('currency'), pk=kwargs['pk'])
+
+        if self.event.is_user_can_manage(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        raise PermissionDenied()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['event'] = self.event
+
+        return context
+
+    def form_valid(self, form):
+        stream = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8-sig', newline='')
+        rows = ROW_READERS[form.cleaned_data['format']](stream)
+
+        try:
+            result = import_expenses(self.event, rows)
+        except (ValidationError, UnicodeDecodeError, csv.Error) as error:
+            form.add_error('file', f'File could not be imported: {error}')
+            return self.form_invalid(form)
+
+        return self.render_to_response(self.get_context_data(form=self.form_class(), result=result))
+
+
+def event_export_view(request: HttpRequest, pk: int, export_format: str) -> StreamingHttpResponse:
+    if export_format not in EXPORTERS:
+        raise Http404()
+
+    event = get_object_or_404(Event.objects.select_related('currency'), pk=pk)
+
+    if not event.is_user_can_manage(request):
+        raise PermissionDenied()
+
+    exporter, content_type = EXPORTERS[export_format]
+    response = StreamingHttpResponse(exporter(event), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="event-{event.pk}-expenses.{export_format}"'
+
+    return response
+
+
+@replica_reads
+@cache_control(private=True, no_cache=True)
+@event_condition
 def event_calculate_view(request: HttpRequest, pk: int) -> HttpResponse:
-    event = (
-        Event.objects
-            .select_related('owner', 'currency')
-            .prefetch_related('participants', 'expenses'
-        ).get(pk=pk))
+    # Totals come from the summary columns and settlements from the cache or one grouped query,
+    # so neither participants nor expenses need to be loaded here. The event itself was already
+    # loaded for the conditional GET check.
+    event = get_request_event(request, pk)
+
+    if event is None:
+        raise Http404()
 
-    settlements = event.calculate_participants_debt()
+    settlements = get_event_settlements(event)
 
     context = {
         'event': event,
@@ -215,3 +304,23 @@ def event_calculate_view(request: HttpRequest, pk: int) -> HttpResponse:
     }
 
     return render(request, 'pages/event-calculate-page.html', context)
+
+
+@staff_member_required
+def settlement_cache_stats_view(request: HttpRequest) -> JsonResponse:
+    return JsonResponse(get_settlement_cache_stats())
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    # closed by default: a scraper needs the token or an allowed address, people need to be staff
+    token = settings.METRICS_TOKEN
+    authorized = (
+        (token and secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')) or
+        request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS or
+        request.user.is_staff
+    )
+
+    if not authorized:
+        raise PermissionDenied()
+
+    return HttpResponse(metrics_registry.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')